@@ -0,0 +1,208 @@
+# aggregate_store.py
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import date, datetime
+
+import pandas as pd
+import streamlit as st
+
+from money import to_money
+
+# ---------------- CONFIG ----------------
+AGG_DB_PATH = os.environ.get("PRICE_AGG_DB", os.path.join(".cache", "aggregates.sqlite"))
+
+AGG_DIMS = {"type_end": "Type_End", "list": "List", "channel": "Channel"}
+
+# เปลี่ยน schema -> เพิ่มเลขนี้: ไฟล์เก่าจะถูกล้างแล้ว backfill ใหม่จากชีต (store เป็นแค่ cache)
+SCHEMA_VERSION = 2
+
+# เดือนเดียวอาจอยู่หลาย worksheet (เช่น ต้นเดือนในชีตเก่า ปลายเดือนในชีตใหม่)
+# -> เก็บยอดแยกตาม source แล้วรวมตอน query
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily_agg (
+    month    TEXT NOT NULL,   -- YYYY-MM
+    day      TEXT NOT NULL,   -- YYYY-MM-DD
+    type_end TEXT NOT NULL,
+    list     TEXT NOT NULL,
+    channel  TEXT NOT NULL,
+    source   TEXT NOT NULL,   -- ชื่อ worksheet
+    total    REAL NOT NULL,
+    n        INTEGER NOT NULL,
+    PRIMARY KEY (day, type_end, list, channel, source)
+);
+CREATE INDEX IF NOT EXISTS ix_daily_agg_month ON daily_agg (month);
+
+CREATE TABLE IF NOT EXISTS closed_months (
+    month     TEXT NOT NULL,
+    source    TEXT NOT NULL,
+    rows      INTEGER NOT NULL,
+    closed_at TEXT NOT NULL,
+    PRIMARY KEY (month, source)
+);
+
+CREATE TABLE IF NOT EXISTS loaded_sheets (
+    sheet     TEXT PRIMARY KEY,
+    loaded_at TEXT NOT NULL
+);
+"""
+
+
+def month_key(d) -> str:
+    return f"{d.year:04d}-{d.month:02d}"
+
+
+def aggregate_frame(df: pd.DataFrame, date_col="Date", price_col="Price") -> pd.DataFrame:
+    """
+    แถวดิบ -> ยอดต่อ วัน x Type_End x List x Channel (month / day / type_end / list / channel / total / n)
+    """
+    cols = ["month", "day", *AGG_DIMS, "total", "n"]
+    if df is None or df.empty or date_col not in df.columns or price_col not in df.columns:
+        return pd.DataFrame(columns=cols)
+
+    dt = pd.to_datetime(df[date_col], dayfirst=True, errors="coerce")
+    d = pd.DataFrame({
+        "day": dt.dt.strftime("%Y-%m-%d"),
+        "month": dt.dt.strftime("%Y-%m"),
+        "price": to_money(df[price_col]),
+    })
+    for key, col in AGG_DIMS.items():
+        d[key] = df[col].fillna("").astype(str) if col in df.columns else ""
+    d = d[dt.notna() & d["price"].notna()]
+
+    return (
+        d.groupby(["month", "day", *AGG_DIMS], as_index=False)
+        .agg(total=("price", "sum"), n=("price", "count"))
+        [cols]
+    )
+
+
+class AggregateStore:
+    """
+    ที่เก็บยอดรวมรายวันของเดือนที่ปิดแล้ว (SQLite ไฟล์เดียว)
+    เขียนครั้งเดียวตอนเดือนปิด จากนั้นใช้ query เปรียบเทียบเดือนต่อเดือนได้ทันที
+    """
+
+    def __init__(self, path: str = AGG_DB_PATH):
+        self.path = path
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with self._connect() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            if con.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                con.executescript(
+                    "DROP TABLE IF EXISTS daily_agg; DROP TABLE IF EXISTS closed_months; "
+                    "DROP TABLE IF EXISTS loaded_sheets;"
+                )
+            con.executescript(_SCHEMA)
+            con.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    @contextmanager
+    def _connect(self):
+        # connection ต่อครั้ง: ใช้ได้จากหลาย thread/process (SQLite จัดการ lock เอง)
+        con = sqlite3.connect(self.path, timeout=30)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    # ---------------- write ----------------
+    def closed_months(self, source: str = None) -> set:
+        """
+        เดือนที่มียอดปิดแล้ว (จาก source ใดก็ได้ หรือเฉพาะ source ที่ระบุ)
+        """
+        sql, params = "SELECT DISTINCT month FROM closed_months", []
+        if source is not None:
+            sql += " WHERE source = ?"
+            params.append(source)
+        with self._connect() as con:
+            return {r[0] for r in con.execute(sql, params)}
+
+    def loaded_sheets(self) -> set:
+        with self._connect() as con:
+            return {r[0] for r in con.execute("SELECT sheet FROM loaded_sheets")}
+
+    def close_months(self, agg: pd.DataFrame, months, source: str) -> list:
+        """
+        บันทึกยอดของ source ในเดือน months (ที่ source นี้ยังไม่ปิด) จาก agg ของ aggregate_frame
+        ยอดของ source อื่นในเดือนเดียวกันไม่ถูกแตะ; คืนรายชื่อเดือนที่เพิ่งปิด
+        """
+        months = sorted(set(months) - self.closed_months(source))
+        if not months:
+            return []
+
+        now = datetime.now().isoformat(timespec="seconds")
+        part = agg[agg["month"].isin(months)]
+        with self._connect() as con:
+            con.executemany(
+                "DELETE FROM daily_agg WHERE month = ? AND source = ?", [(m, source) for m in months]
+            )
+            con.executemany(
+                "INSERT INTO daily_agg (month, day, type_end, list, channel, source, total, n) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (m, d, t, l, c, source, float(total), int(n))
+                    for m, d, t, l, c, total, n in part.itertuples(index=False, name=None)
+                ],
+            )
+            counts = part.groupby("month")["n"].sum()
+            con.executemany(
+                "INSERT OR IGNORE INTO closed_months (month, source, rows, closed_at) VALUES (?, ?, ?, ?)",
+                [(m, source, int(counts.get(m, 0)), now) for m in months],
+            )
+        return months
+
+    def close_finished_months(self, df: pd.DataFrame, source: str, today: date = None) -> list:
+        """
+        ปิดทุกเดือนใน df ที่จบไปแล้ว (ก่อนเดือนของ today) และ source นี้ยังไม่เคยบันทึก
+        """
+        today = today or date.today()
+        agg = aggregate_frame(df)
+        months = [m for m in agg["month"].unique() if m < month_key(today)]
+        return self.close_months(agg, months, source)
+
+    def mark_sheet_loaded(self, sheet: str):
+        with self._connect() as con:
+            con.execute(
+                "INSERT OR REPLACE INTO loaded_sheets (sheet, loaded_at) VALUES (?, ?)",
+                (sheet, datetime.now().isoformat(timespec="seconds")),
+            )
+
+    # ---------------- read ----------------
+    def period_total(self, month: str, upto_day: int = None, by: str = None, **filters):
+        """
+        ยอดรวมของ month (ถึงวันที่ upto_day ถ้ากำหนด)
+        by: None -> float, หรือ "type_end" / "list" / "channel" -> Series
+        filters: type_end= / list= / channel= (None หรือ "All" = ไม่กรอง)
+        """
+        where, params = ["month = ?"], [month]
+        if upto_day:
+            where.append("day <= ?")
+            params.append(f"{month}-{int(upto_day):02d}")
+        for key, val in filters.items():
+            if key in AGG_DIMS and val not in (None, "All"):
+                where.append(f"{key} = ?")
+                params.append(str(val))
+
+        if by is not None and by not in AGG_DIMS:
+            raise ValueError(f"by ต้องเป็นหนึ่งใน {list(AGG_DIMS)}")
+
+        select = f"{by}, SUM(total)" if by else "SUM(total)"
+        sql = f"SELECT {select} FROM daily_agg WHERE {' AND '.join(where)}"
+        if by:
+            sql += f" GROUP BY {by}"
+
+        with self._connect() as con:
+            rows = con.execute(sql, params).fetchall()
+
+        if by is None:
+            return float(rows[0][0] or 0.0)
+        return pd.Series({k: v for k, v in rows}, name="Total", dtype="float64")
+
+
+@st.cache_resource
+def get_aggregate_store(path: str = AGG_DB_PATH) -> AggregateStore:
+    # 1 store ต่อไฟล์ (แต่ละ tenant มีไฟล์ของตัวเอง)
+    return AggregateStore(path)
@@ -0,0 +1,226 @@
+# analytics.py
+import threading
+
+import numpy as np
+import pandas as pd
+
+from money import to_money
+
+# ---------------- CONFIG ----------------
+ROLLING_WINDOWS = (7, 14, 30)
+
+
+def _window_sums(cum: np.ndarray, window: int) -> np.ndarray:
+    """
+    ผลรวมย้อนหลัง window วัน จาก cumsum (O(n), ไม่ต้องวนทีละหน้าต่าง)
+    cum = cumsum ที่มี 0 นำหน้า (ยาว n + 1)
+    """
+    n = len(cum) - 1
+    end = np.arange(1, n + 1)
+    start = np.maximum(end - window, 0)
+    return cum[end] - cum[start]
+
+
+def build_overlays(
+    daily: pd.Series,
+    cum: np.ndarray | None = None,
+    windows=ROLLING_WINDOWS,
+) -> pd.DataFrame:
+    """
+    daily: Series ยอดรายวัน (index = วันที่ต่อเนื่อง, วันที่ไม่มีรายการ = 0)
+    คืน Sum/Mean ของแต่ละ window + MTD (cumulative รายเดือน)
+    """
+    values = daily.to_numpy(dtype="float64")
+    if cum is None:
+        cum = np.concatenate([[0.0], np.cumsum(values)])
+
+    out = pd.DataFrame(index=daily.index)
+    n_days = np.arange(1, len(values) + 1)
+    for w in windows:
+        s = _window_sums(cum, w)
+        out[f"Sum_{w}D"] = s
+        out[f"Mean_{w}D"] = s / np.minimum(n_days, w)
+
+    # MTD = cumsum - cumsum ณ ต้นเดือน
+    idx = pd.DatetimeIndex(daily.index)
+    if len(idx):
+        month_start = (idx - pd.to_timedelta(idx.day - 1, unit="D")).normalize()
+        first_pos = (month_start - idx[0]).days.to_numpy().clip(min=0)
+        out["MTD"] = cum[1:] - cum[first_pos]
+    else:
+        out["MTD"] = np.empty(0)
+    return out
+
+
+class DailyRollup:
+    """
+    ยอดรายวัน (รวม + แยกตาม dims) ที่อัปเดตแบบ incremental
+
+    - sync(df, version, base_rows) ผูกกับ data version ของ snapshot:
+      snapshot ใหม่ -> rebuild, snapshot เดิม -> append เฉพาะแถว overlay (pending) ที่เพิ่มมา
+    - cumsum ถูก cache ไว้ และคำนวณใหม่เฉพาะช่วงวันที่มีการเปลี่ยน
+    """
+
+    def __init__(self, dims=("List",), date_col="Date", price_col="Price"):
+        self.dims = tuple(dims)
+        self.date_col = date_col
+        self.price_col = price_col
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        self.start = None                  # pd.Timestamp ของวันแรก
+        self.totals = np.zeros(0)          # (n_days,)
+        self.keys = {d: {} for d in self.dims}         # dim -> {category: col}
+        self.matrix = {d: np.zeros((0, 0)) for d in self.dims}  # dim -> (n_days, n_cat)
+        self.rows_seen = 0
+        self.version = getattr(self, "version", -1) + 1  # เปลี่ยนทุกครั้งที่ข้อมูลเปลี่ยน
+        self.snapshot_version = None       # data version ของ snapshot ที่ใช้สร้าง
+        self._base_rows = 0                # จำนวนแถวของ snapshot (ที่เหลือ = overlay)
+        self._overlay_sigs = []            # signature ของแถว overlay ที่ append แล้ว
+        self._cum = np.zeros(1)
+        self._dirty_from = 0
+
+    # ---------------- update ----------------
+    @staticmethod
+    def _row_signature(df: pd.DataFrame, i: int):
+        return tuple(df.iloc[i].astype(str))
+
+    @property
+    def data_version(self):
+        """
+        key ของข้อมูลที่อยู่ใน rollup (snapshot + overlay) ใช้เป็น cache key ข้าม instance ได้
+        None = ไม่รู้ version (rollup ชั่วคราว)
+        """
+        if self.snapshot_version is None:
+            return None
+        return f"{self.snapshot_version}:{hash(tuple(self._overlay_sigs))}"
+
+    def sync(self, df: pd.DataFrame, version=None, base_rows: int = None) -> "DailyRollup":
+        """
+        version  : data version ของ snapshot (เช่น meta.version); None = rebuild ทุกครั้ง
+        base_rows: จำนวนแถวของ snapshot ใน df (แถวหลังจากนั้น = overlay ของ write queue)
+
+        - snapshot เดิม และ overlay ที่เคยเห็นยังเหมือนเดิม -> append เฉพาะแถว overlay ใหม่
+        - snapshot เปลี่ยน (แถวไหนก็ถูกแก้/ลบได้) หรือ overlay เปลี่ยน -> rebuild
+        """
+        with self._lock:
+            n = 0 if df is None else len(df)
+            base = n if base_rows is None else min(base_rows, n)
+            overlay_sigs = [self._row_signature(df, i) for i in range(base, n)]
+
+            same = (
+                version is not None
+                and version == self.snapshot_version
+                and base == self._base_rows
+                and overlay_sigs[:len(self._overlay_sigs)] == self._overlay_sigs
+            )
+            if not same:
+                self.reset()
+                self.snapshot_version, self._base_rows = version, base
+
+            if n > self.rows_seen:
+                self.append(df.iloc[self.rows_seen:])
+            self._overlay_sigs = overlay_sigs
+            return self
+
+    def append(self, rows: pd.DataFrame):
+        with self._lock:
+            if rows is None or rows.empty:
+                return
+
+            self.rows_seen += len(rows)
+            self.version += 1
+
+            if self.date_col not in rows.columns or self.price_col not in rows.columns:
+                return
+
+            dt = pd.to_datetime(rows[self.date_col], dayfirst=True, errors="coerce").dt.normalize()
+            price = to_money(rows[self.price_col])
+            ok = (dt.notna() & price.notna()).to_numpy()
+            if not ok.any():
+                return
+
+            dt = dt[ok]
+            price = price.to_numpy()[ok]
+            self._ensure_range(dt.min(), dt.max())
+            pos = (dt - self.start).dt.days.to_numpy()
+
+            np.add.at(self.totals, pos, price)
+
+            for dim in self.dims:
+                if dim not in rows.columns:
+                    continue
+                cat = rows[dim].to_numpy()[ok]
+                has_cat = pd.notna(cat)
+                codes = self._category_codes(dim, cat[has_cat].astype(str))
+                np.add.at(self.matrix[dim], (pos[has_cat], codes), price[has_cat])
+
+            self._dirty_from = min(self._dirty_from, int(pos.min()))
+
+    def _ensure_range(self, lo: pd.Timestamp, hi: pd.Timestamp):
+        if self.start is None:
+            self.start = lo
+        before = max((self.start - lo).days, 0)
+        after = max((hi - self.start).days + 1 + before - len(self.totals), 0)
+        if not before and not after:
+            return
+
+        self.totals = np.pad(self.totals, (before, after))
+        for dim in self.dims:
+            self.matrix[dim] = np.pad(self.matrix[dim], ((before, after), (0, 0)))
+        if before:
+            self.start = lo
+            self._dirty_from = 0
+        self._cum = np.pad(self._cum, (0, before + after), mode="edge")
+
+    def _category_codes(self, dim: str, cats: np.ndarray) -> np.ndarray:
+        lookup = self.keys[dim]
+        new = [c for c in pd.unique(cats) if c not in lookup]
+        if new:
+            for c in new:
+                lookup[c] = len(lookup)
+            self.matrix[dim] = np.pad(self.matrix[dim], ((0, 0), (0, len(new))))
+        return np.fromiter((lookup[c] for c in cats), dtype=np.int64, count=len(cats))
+
+    # ---------------- read ----------------
+    @property
+    def dates(self) -> pd.DatetimeIndex:
+        if self.start is None:
+            return pd.DatetimeIndex([])
+        return pd.date_range(self.start, periods=len(self.totals), freq="D")
+
+    def daily(self, dim=None, key=None) -> pd.Series:
+        with self._lock:
+            if dim is None:
+                values = self.totals.copy()
+            elif key in self.keys.get(dim, {}):
+                values = self.matrix[dim][:, self.keys[dim][key]].copy()
+            else:
+                values = np.zeros(len(self.totals))
+            return pd.Series(values, index=self.dates)
+
+    def daily_by(self, dim: str) -> pd.DataFrame:
+        """
+        ตาราง วัน x หมวด ของ dim (เช่น List)
+        """
+        with self._lock:
+            lookup = self.keys.get(dim, {})
+            cols = sorted(lookup, key=lookup.get)
+            data = self.matrix[dim].copy() if cols else np.zeros((len(self.totals), 0))
+            return pd.DataFrame(data, index=self.dates, columns=cols)
+
+    def _total_cumsum(self) -> np.ndarray:
+        # คำนวณ cumsum ใหม่เฉพาะช่วงที่ dirty
+        k = self._dirty_from
+        if k < len(self.totals):
+            base = self._cum[k]
+            self._cum[k + 1:] = base + np.cumsum(self.totals[k:])
+            self._dirty_from = len(self.totals)
+        return self._cum
+
+    def overlays(self, dim=None, key=None, windows=ROLLING_WINDOWS) -> pd.DataFrame:
+        with self._lock:
+            if dim is None:
+                return build_overlays(self.daily(), cum=self._total_cumsum().copy(), windows=windows)
+        return build_overlays(self.daily(dim, key), windows=windows)
@@ -0,0 +1,100 @@
+# anomaly.py
+import warnings
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from analytics import DailyRollup
+
+# ---------------- CONFIG ----------------
+ANOMALY_WINDOW = 28      # วันย้อนหลังที่ใช้เป็น baseline (ไม่รวมวันนั้นเอง)
+ANOMALY_MIN_PERIODS = 5  # จำนวนวันขั้นต่ำใน window ถึงจะให้คะแนน
+ANOMALY_THRESHOLD = 3.5  # |robust z| ที่ถือว่าผิดปกติ
+
+_MAD_SCALE = 0.6745       # ทำให้ MAD เทียบได้กับ std ของ normal
+_MEAN_AD_SCALE = 0.7979   # fallback เมื่อ MAD = 0 (ใช้ mean absolute deviation)
+_MIN_SCALE_FRACTION = 0.05  # baseline คงที่ (MAD = meanAD = 0) -> ใช้ 5% ของ median เป็น scale ขั้นต่ำ
+
+
+def robust_zscores(
+    values: np.ndarray,
+    window: int = ANOMALY_WINDOW,
+    min_periods: int = ANOMALY_MIN_PERIODS,
+    ignore_zeros=False,
+):
+    """
+    values: (n_days, n_series) ยอดรายวัน
+    คืน (z, median) ขนาดเท่ากัน โดย baseline = rolling median/MAD ของ window วันก่อนหน้า
+    คำนวณทุก series พร้อมกันใน pass เดียว (sliding window view, ไม่ copy ข้อมูล)
+
+    ignore_zeros: bool หรือ mask ต่อ series; วันที่เป็น 0 ไม่นับเป็น baseline และไม่ให้คะแนน
+    (เหมาะกับหมวดที่ไม่ได้ใช้ทุกวัน)
+    """
+    x = np.asarray(values, dtype="float64")
+    if x.ndim == 1:
+        x = x[:, None]
+    n_days, n_series = x.shape
+
+    ignore = np.broadcast_to(np.asarray(ignore_zeros, dtype=bool), (n_series,))
+    x = np.where(ignore & (x == 0), np.nan, x)
+
+    # แถวที่ t ของ windows = วัน t-window .. t-1
+    padded = np.vstack([np.full((window, n_series), np.nan), x[:-1]]) if n_days else x
+    windows = sliding_window_view(padded, window, axis=0)[:n_days]  # (n_days, n_series, window)
+
+    # window ว่าง (All-NaN slice) เป็นเรื่องปกติ -> ไม่ต้องเตือน
+    with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        count = np.sum(~np.isnan(windows), axis=-1)
+        med = np.nanmedian(windows, axis=-1)
+        dev = np.abs(windows - med[..., None])
+        mad = np.nanmedian(dev, axis=-1) / _MAD_SCALE
+        mean_ad = np.nanmean(dev, axis=-1) / _MEAN_AD_SCALE
+        scale = np.where(mad > 0, mad, mean_ad)
+        scale = np.fmax(scale, _MIN_SCALE_FRACTION * np.abs(med))
+
+        z = (x - med) / scale
+
+    z[(count < min_periods) | ~(scale > 0) | np.isnan(x)] = np.nan
+    return z, med
+
+
+def detect_anomalies(
+    rollup: DailyRollup,
+    dims=("List", "Type_End"),
+    window: int = ANOMALY_WINDOW,
+    threshold: float = ANOMALY_THRESHOLD,
+) -> pd.DataFrame:
+    """
+    ให้คะแนนยอดรวมรายวัน + ทุก series ของ dims จาก rollup ทีเดียว
+    คืนเฉพาะจุดที่ใช้เงินพุ่งขึ้น (z >= threshold): Date / Series / Key / Value / Median / Z
+    """
+    cols = ["Date", "Series", "Key", "Value", "Median", "Z"]
+    if rollup is None or rollup.start is None:
+        return pd.DataFrame(columns=cols)
+
+    # รวมทุก series เป็น matrix เดียว: [Total | List... | Type_End...]
+    blocks = [rollup.daily().to_frame("Total")]
+    labels = [("Total", "Total")]
+    for dim in dims:
+        by = rollup.daily_by(dim)
+        blocks.append(by)
+        labels += [(dim, str(k)) for k in by.columns]
+
+    matrix = np.hstack([b.to_numpy() for b in blocks])
+    ignore = np.array([series != "Total" for series, _ in labels])
+
+    z, med = robust_zscores(matrix, window=window, ignore_zeros=ignore)
+
+    day_idx, col_idx = np.nonzero(np.nan_to_num(z) >= threshold)
+    label_arr = np.array(labels, dtype=object).reshape(-1, 2)
+    out = pd.DataFrame({
+        "Date": rollup.dates[day_idx],
+        "Series": label_arr[col_idx, 0],
+        "Key": label_arr[col_idx, 1],
+        "Value": matrix[day_idx, col_idx],
+        "Median": med[day_idx, col_idx],
+        "Z": z[day_idx, col_idx],
+    }, columns=cols)
+    return out.sort_values(["Date", "Z"], ascending=[True, False]).reset_index(drop=True)
@@ -0,0 +1,63 @@
+# benchmarks/bench_money.py
+# เทียบ parse_money กับ chain เดิม (astype(str).str.replace("฿").str.replace(",")) ที่ 1M แถว
+#
+#   python benchmarks/bench_money.py [rows]
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from money import parse_money  # noqa: E402
+
+
+def old_chain(s: pd.Series) -> pd.Series:
+    out = (
+        s.astype(str)
+        .str.replace("฿", "", regex=False)
+        .str.replace(",", "", regex=False)
+        .str.strip()
+    )
+    return pd.to_numeric(out, errors="coerce")
+
+
+def make_prices(rows: int, unique: int, seed: int = 0) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    amounts = rng.integers(1, 500_000, size=unique) / 100
+    pool = np.array([f"฿{v:,.2f}" for v in amounts], dtype=object)
+    return pd.Series(pool[rng.integers(0, unique, size=rows)])
+
+
+def bench(fn, s: pd.Series, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(s)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    for unique in (1_000, 50_000, rows):
+        s = make_prices(rows, unique)
+
+        old_v = old_chain(s).to_numpy()
+        new_v, _ = parse_money(s)
+        assert np.allclose(old_v, new_v, equal_nan=True)
+
+        t_old = bench(old_chain, s)
+        t_new = bench(lambda x: parse_money(x), s)
+        print(
+            f"rows={rows:>9,} unique={unique:>9,} | "
+            f"old chain {t_old * 1000:8.1f} ms | parse_money {t_new * 1000:8.1f} ms | "
+            f"x{t_old / t_new:5.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
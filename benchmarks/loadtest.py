@@ -0,0 +1,404 @@
+# benchmarks/loadtest.py
+# จำลองผู้ใช้หลายคนเปลี่ยน filter พร้อมกันบน Streamlit server จริง (streamlit run + fake sheet)
+#
+#   python benchmarks/loadtest.py --sessions 20 --steps 10
+#   python benchmarks/loadtest.py --sessions 50 --steps 20 --days 365 --json result.json
+#   python benchmarks/loadtest.py --sessions 50 --servers 2 --write-ratio 0.05   # 2 worker + มีคนกรอกรายการ
+#
+# 1 session = websocket client 1 ตัว คุยโปรโตคอลเดียวกับ browser
+# (BackMsg.rerun_script พร้อม widget state -> รอ ForwardMsg จนถึง script_finished)
+# ทุก session ของ server เดียวกันแย่ง GIL / st.cache_* / write queue ของ process เดียวกันเหมือนผู้ใช้จริง
+# --servers > 1 = หลาย worker process บนเครื่องเดียว (ใช้ fake sheet / shared cache / aggregate store ชุดเดียวกัน)
+# session กระจายแบบ round-robin; CPU และ RSS อ่านจาก /proc ของทุก server process (Linux) แล้วรายงานรวม
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import date, timedelta
+
+import numpy as np
+import websockets
+from streamlit.proto.Alert_pb2 import Alert
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+FILTER_SELECTS = ["type_select", "list_select", "channel_select"]
+FORM_SELECTS = ["List", "Type", "Type_End", "Channel"]
+SUBMIT_LABEL = "บันทึก"
+RSS_SAMPLE_INTERVAL = 0.2    # วินาที
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def prepare_env(days: int, rows_per_day: int) -> str:
+    """
+    สร้าง fake sheet + cache dir ชั่วคราว แล้วชี้ env ของแอปไปที่นั่น (server ที่ start ทีหลังได้ env นี้)
+    """
+    tmp = tempfile.mkdtemp(prefix="price-loadtest-")
+    os.environ["PRICE_FAKE_SHEET_DIR"] = os.path.join(tmp, "sheet")
+    os.environ["PRICE_SHARED_CACHE_DIR"] = os.path.join(tmp, "shared")
+    os.environ["PRICE_AGG_DB"] = os.path.join(tmp, "aggregates.sqlite")
+
+    from fake_sheet import seed_fake_sheet
+
+    today = date.today()
+    seed_fake_sheet(
+        os.environ["PRICE_FAKE_SHEET_DIR"], "Month_25",
+        today - timedelta(days=days - 1), today, rows_per_day=rows_per_day,
+    )
+    return tmp
+
+
+# ---------------- SERVER ----------------
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class Server:
+    """
+    `streamlit run main.py` 1 process (= 1 worker) รันใน folder ชั่วคราว (ไม่อ่าน secrets.toml ของเครื่อง)
+    """
+
+    def __init__(self, workdir: str, index: int):
+        self.port = _free_port()
+        self.url = f"ws://127.0.0.1:{self.port}/_stcore/stream"
+        self.log_path = os.path.join(workdir, f"server-{index}.log")
+        with open(self.log_path, "w") as log:
+            self.proc = subprocess.Popen(
+                [
+                    sys.executable, "-m", "streamlit", "run", os.path.join(ROOT, "main.py"),
+                    "--server.headless=true",
+                    "--server.address=127.0.0.1",
+                    f"--server.port={self.port}",
+                    "--server.fileWatcherType=none",
+                    "--browser.gatherUsageStats=false",
+                    "--logger.level=error",
+                ],
+                cwd=workdir,
+                env=dict(os.environ),
+                stdout=log,
+                stderr=subprocess.STDOUT,
+            )
+
+    def wait_ready(self, timeout: float):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.proc.poll() is not None:
+                raise RuntimeError(f"server ปิดตัวเอง ดู log: {self.log_path}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{self.port}/_stcore/health", timeout=1):
+                    return
+            except OSError:
+                time.sleep(0.2)
+        raise RuntimeError(f"server ไม่พร้อมใน {timeout:.0f}s ดู log: {self.log_path}")
+
+    def rss_bytes(self) -> int:
+        # /proc/<pid>/statm: field ที่ 2 = resident pages
+        try:
+            with open(f"/proc/{self.proc.pid}/statm") as f:
+                return int(f.read().split()[1]) * PAGE_SIZE
+        except OSError:
+            return 0
+
+    def cpu_seconds(self) -> float:
+        # /proc/<pid>/stat: utime + stime (field 14, 15) เป็น clock tick
+        try:
+            with open(f"/proc/{self.proc.pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+        except OSError:
+            return 0.0
+
+    def stop(self):
+        self.proc.terminate()
+        try:
+            self.proc.wait(10)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+
+
+async def sample_rss(servers: list, peaks: dict, stop: asyncio.Event):
+    """
+    อ่าน RSS ทุก server เป็นระยะ: peak ต่อ process และ peak ของผลรวม (ณ เวลาเดียวกัน)
+    """
+    while not stop.is_set():
+        current = [s.rss_bytes() for s in servers]
+        for i, rss in enumerate(current):
+            peaks["per_server"][i] = max(peaks["per_server"][i], rss)
+        peaks["total"] = max(peaks["total"], sum(current))
+        try:
+            await asyncio.wait_for(stop.wait(), RSS_SAMPLE_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+
+# ---------------- CLIENT ----------------
+class Session:
+    """
+    websocket client 1 ตัว = ผู้ใช้ 1 คน: จำค่า widget ที่ตั้งไว้ (ตาม label) แล้วส่งไปทุก rerun เหมือน browser
+    """
+
+    def __init__(self, url: str, timeout: float):
+        self.url = url
+        self.timeout = timeout
+        self.ws = None
+        self.widgets = {}      # label -> (ชนิด, proto ของ element) จาก rerun ล่าสุด
+        self.values = {}       # label -> ค่าที่ผู้ใช้ตั้ง (ส่งซ้ำทุก rerun)
+        self.triggers = set()  # label ของปุ่มที่กด (ส่งครั้งเดียว)
+
+    async def connect(self):
+        self.ws = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None)
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+
+    def _widget_states(self) -> list:
+        states = []
+        for label, value in self.values.items():
+            if label not in self.widgets:
+                continue
+            kind, el = self.widgets[label]
+            ws = WidgetState(id=el.id)
+            if kind == "date_input":
+                ws.string_array_value.data[:] = [value.isoformat()]
+            elif kind == "number_input":
+                ws.double_value = value
+            else:
+                ws.string_value = value
+            states.append(ws)
+        for label in self.triggers:
+            if label in self.widgets:
+                states.append(WidgetState(id=self.widgets[label][1].id, trigger_value=True))
+        self.triggers = set()
+        return states
+
+    async def rerun(self) -> tuple:
+        """
+        ส่ง rerun แล้วรอจน script รันจบ (รวม st.rerun ต่อเนื่อง) คืน (วินาที, จำนวน error ที่แอปแสดง)
+        """
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.page_script_hash = ""
+        msg.rerun_script.widget_states.widgets.extend(self._widget_states())
+
+        t0 = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        widgets, errors = {}, 0
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(await asyncio.wait_for(self.ws.recv(), self.timeout))
+            kind = fwd.WhichOneof("type")
+
+            if kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                el = fwd.delta.new_element
+                el_type = el.WhichOneof("type")
+                if el_type in ("selectbox", "date_input", "number_input"):
+                    widgets[getattr(el, el_type).label] = (el_type, getattr(el, el_type))
+                elif el_type == "button" and el.button.is_form_submitter:
+                    widgets[el.button.label] = (el_type, el.button)
+                elif el_type == "exception" or (el_type == "alert" and el.alert.format == Alert.ERROR):
+                    errors += 1
+
+            elif kind == "script_finished":
+                if fwd.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    break
+                widgets, errors = {}, 0   # st.rerun(): นับเฉพาะรอบสุดท้ายที่ผู้ใช้เห็น
+
+        self.widgets = widgets
+        return time.perf_counter() - t0, errors
+
+
+def random_step(session: Session, rng: random.Random, write_ratio: float = 0.0) -> str:
+    """
+    เปลี่ยน filter แบบสุ่ม 1 อย่าง (ช่วงวันที่ หรือ Type_End / List / Channel) หรือกรอกรายการใหม่
+    """
+    widgets = session.widgets
+    if write_ratio and rng.random() < write_ratio and SUBMIT_LABEL in widgets:
+        session.values["Date"] = date.today()
+        session.values["Price"] = round(rng.uniform(10, 500), 2)
+        for label in FORM_SELECTS:
+            options = list(widgets[label][1].options) if label in widgets else []
+            if options:
+                session.values[label] = rng.choice(options)
+        session.triggers.add(SUBMIT_LABEL)
+        return "submit"
+
+    if rng.random() < 0.35 and "from_date" in widgets and "to_date" in widgets:
+        lo = date.fromisoformat(widgets["from_date"][1].min)
+        hi = date.fromisoformat(widgets["to_date"][1].max)
+        span = (hi - lo).days
+        a = lo + timedelta(days=rng.randint(0, span))
+        b = lo + timedelta(days=rng.randint(0, span))
+        session.values["from_date"], session.values["to_date"] = min(a, b), max(a, b)
+        return "dates"
+
+    name = rng.choice(FILTER_SELECTS)
+    session.values[name] = rng.choice(list(widgets[name][1].options))
+    return name
+
+
+async def run_session(
+    session_id: int,
+    server: Server,
+    steps: int,
+    seed: int,
+    timeout: float,
+    think: float,
+    write_ratio: float,
+    gate: asyncio.Semaphore,
+) -> dict:
+    rng = random.Random(seed + session_id)
+    session = Session(server.url, timeout)
+
+    async with gate:
+        await session.connect()
+        try:
+            cold, errors = await session.rerun()
+            if errors:
+                raise RuntimeError(f"session {session_id}: แอปแสดง error ตั้งแต่ครั้งแรก ดู log: {server.log_path}")
+
+            latencies = []
+            for _ in range(steps):
+                if think:
+                    await asyncio.sleep(rng.uniform(0, 2 * think))
+                action = random_step(session, rng, write_ratio)
+                elapsed, step_errors = await session.rerun()
+                latencies.append((action, elapsed))
+                errors += step_errors
+        finally:
+            await session.close()
+
+    return {"session": session_id, "cold": cold, "latencies": latencies, "errors": errors}
+
+
+# ---------------- REPORT ----------------
+def summarize(results: list, wall: float, server_cpu: float, client_cpu: float, rss: dict) -> dict:
+    lat = np.array([t for r in results for _, t in r["latencies"]]) * 1000
+    cold = np.array([r["cold"] for r in results]) * 1000
+    by_action = {}
+    for r in results:
+        for action, t in r["latencies"]:
+            by_action.setdefault(action, []).append(t * 1000)
+
+    def pct(a):
+        if not len(a):
+            return {}
+        p50, p95, p99 = np.percentile(a, [50, 95, 99])
+        return {"p50_ms": p50, "p95_ms": p95, "p99_ms": p99, "max_ms": float(np.max(a)), "n": int(len(a))}
+
+    mb = 1024 ** 2
+    return {
+        "sessions": len(results),
+        "servers": len(rss["per_server"]),
+        "reruns": int(len(lat)),
+        "errors": int(sum(r["errors"] for r in results)),
+        "wall_s": wall,
+        "reruns_per_s": len(lat) / wall if wall else 0.0,
+        "server_cpu_s": server_cpu,
+        "server_cores_used": server_cpu / wall if wall else 0.0,
+        # client อยู่ process เดียว (asyncio) ถ้าใกล้ 1 core แปลว่า client เองเป็นคอขวด ตัวเลข latency จะเกินจริง
+        "client_cores_used": client_cpu / wall if wall else 0.0,
+        "peak_rss_mb_per_server": [b / mb for b in rss["per_server"]],
+        "peak_rss_mb_total": rss["total"] / mb,
+        "rerun": pct(lat),
+        "cold_start": pct(cold),
+        "by_action": {k: pct(np.array(v)) for k, v in sorted(by_action.items())},
+    }
+
+
+def print_report(s: dict):
+    def row(name, p):
+        return f"{name:<16} {p['n']:>6} {p['p50_ms']:>9.1f} {p['p95_ms']:>9.1f} {p['p99_ms']:>9.1f} {p['max_ms']:>9.1f}"
+
+    per_server = ", ".join(f"{m:.0f}" for m in s["peak_rss_mb_per_server"])
+    print(f"\nsessions={s['sessions']} servers={s['servers']} reruns={s['reruns']} errors={s['errors']} "
+          f"wall={s['wall_s']:.1f}s throughput={s['reruns_per_s']:.2f} reruns/s")
+    print(f"server cpu={s['server_cpu_s']:.1f}s ({s['server_cores_used']:.2f} cores)  "
+          f"client {s['client_cores_used']:.2f} cores")
+    print(f"peak RSS total={s['peak_rss_mb_total']:.0f} MB  per server=[{per_server}] MB\n")
+    print(f"{'':<16} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    print(row("rerun (all)", s["rerun"]))
+    print(row("cold start", s["cold_start"]))
+    for name, p in s["by_action"].items():
+        print(row(f"  {name}", p))
+
+
+async def run_load(args, servers: list) -> dict:
+    gate = asyncio.Semaphore(args.concurrency or args.sessions)
+    rss = {"per_server": [0] * len(servers), "total": 0}
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(sample_rss(servers, rss, stop))
+
+    cpu0 = sum(s.cpu_seconds() for s in servers)
+    client0 = resource.getrusage(resource.RUSAGE_SELF)
+    t0 = time.perf_counter()
+    try:
+        results = await asyncio.gather(*[
+            run_session(
+                i, servers[i % len(servers)], args.steps, args.seed, args.timeout,
+                args.think_ms / 1000, args.write_ratio, gate,
+            )
+            for i in range(args.sessions)
+        ])
+    finally:
+        stop.set()
+        await sampler
+    wall = time.perf_counter() - t0
+    client1 = resource.getrusage(resource.RUSAGE_SELF)
+
+    server_cpu = sum(s.cpu_seconds() for s in servers) - cpu0
+    client_cpu = (client1.ru_utime + client1.ru_stime) - (client0.ru_utime + client0.ru_stime)
+    return summarize(results, wall, server_cpu, client_cpu, rss)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Concurrent-session load test for the Price Dashboard")
+    ap.add_argument("--sessions", type=int, default=20)
+    ap.add_argument("--steps", type=int, default=10, help="จำนวนครั้งที่เปลี่ยน filter ต่อ session")
+    ap.add_argument("--concurrency", type=int, default=None, help="session ที่ต่ออยู่พร้อมกัน (default = sessions)")
+    ap.add_argument("--servers", type=int, default=1, help="จำนวน streamlit worker process")
+    ap.add_argument("--think-ms", type=float, default=0.0, help="เวลาคิดเฉลี่ยระหว่าง step (0 = ยิงต่อเนื่อง)")
+    ap.add_argument("--write-ratio", type=float, default=0.0, help="สัดส่วน step ที่กรอกรายการใหม่ผ่านฟอร์ม")
+    ap.add_argument("--days", type=int, default=90, help="จำนวนวันของข้อมูลปลอม")
+    ap.add_argument("--rows-per-day", type=int, default=6)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--timeout", type=float, default=120.0, help="วินาทีสูงสุดต่อ rerun")
+    ap.add_argument("--json", help="บันทึกผลเป็น json")
+    args = ap.parse_args()
+
+    tmp = prepare_env(args.days, args.rows_per_day)
+    print(f"fake data: {tmp}")
+
+    servers = [Server(tmp, i) for i in range(args.servers)]
+    try:
+        for s in servers:
+            s.wait_ready(args.timeout)
+        summary = asyncio.run(run_load(args, servers))
+    finally:
+        for s in servers:
+            s.stop()
+
+    print_report(summary)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
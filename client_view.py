@@ -0,0 +1,388 @@
+# client_view.py
+# โหมด filter ฝั่ง browser: ส่งยอดรวม วัน x หมวด ไปครั้งเดียวต่อ data version
+# แล้วให้ JS คิด KPI / trend / donut / ตาราง List ใหม่เองทุกครั้งที่เปลี่ยน filter (ไม่ rerun script)
+import base64
+import json
+
+import numpy as np
+import pandas as pd
+import streamlit.components.v1 as components
+from plotly.offline import get_plotlyjs_version
+
+from money import to_money
+
+# ---------------- CONFIG ----------------
+# Type_End = ทั้ง filter และหมวดของ donut (ตรงกับโหมด server / Month over Month)
+CLIENT_DIMS = ("Type_End", "List", "Channel")
+CLIENT_HEIGHT = 1180
+TYPE_COLORS = ["#8fd0ff", "#2b7cff", "#ffb6c1", "#ff2d2d", "#9b8cff", "#5ee0c2"]
+
+
+def _b64(arr: np.ndarray) -> str:
+    # typed array ฝั่ง JS เป็น little-endian
+    return base64.b64encode(np.ascontiguousarray(arr).astype(arr.dtype.newbyteorder("<")).tobytes()).decode("ascii")
+
+
+def build_client_payload(df: pd.DataFrame, date_col="Date", price_col="Price") -> dict:
+    """
+    แถวดิบ -> ตารางยอดรวมต่อ วัน x Type_End x List x Channel แบบ columnar
+    - day  : Int32 (จำนวนวันนับจาก start)
+    - dims : Int16/Int32 code ชี้ไปที่ labels (-1 = ว่าง)
+    - total: Float64, n: Int32 (จำนวนแถวที่ราคาแปลงได้)
+    """
+    dt = pd.to_datetime(df[date_col], dayfirst=True, errors="coerce").dt.normalize()
+    price = to_money(df[price_col])
+    ok = (dt.notna() & price.notna()).to_numpy()
+    if not ok.any():
+        return None
+
+    dt, price = dt[ok], price[ok].to_numpy(dtype="float64")
+    start = dt.min()
+    day = ((dt - start).dt.days).to_numpy(dtype="int64")
+
+    labels, codes = {}, []
+    for dim in CLIENT_DIMS:
+        if dim in df.columns:
+            c, uniq = pd.factorize(df.loc[ok, dim].astype("string").str.strip().replace("", pd.NA), sort=True)
+        else:
+            c, uniq = np.full(len(day), -1), []
+        labels[dim] = [str(u) for u in uniq]
+        codes.append(c.astype("int64"))
+
+    # รวมแถวที่ key ซ้ำกัน (วันเดียวกัน หมวดเดียวกัน) -> payload เล็กกว่า raw หลายเท่า
+    keys = np.stack([day, *codes], axis=1)
+    uniq_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    total = np.zeros(len(uniq_keys))
+    np.add.at(total, inverse, price)
+    n = np.bincount(inverse, minlength=len(uniq_keys))
+
+    columns = {"day": {"type": "Int32", "data": _b64(uniq_keys[:, 0].astype(np.int32))}}
+    for i, dim in enumerate(CLIENT_DIMS, start=1):
+        code_type = np.int16 if len(labels[dim]) < np.iinfo(np.int16).max else np.int32
+        columns[dim] = {
+            "type": "Int16" if code_type is np.int16 else "Int32",
+            "data": _b64(uniq_keys[:, i].astype(code_type)),
+        }
+    columns["total"] = {"type": "Float64", "data": _b64(total)}
+    columns["n"] = {"type": "Int32", "data": _b64(n.astype(np.int32))}
+
+    return {
+        "start": f"{start:%Y-%m-%d}",
+        "days": int(day.max()) + 1,
+        "rows": int(len(uniq_keys)),
+        "labels": labels,
+        "columns": columns,
+    }
+
+
+def render_client_dashboard(payload: dict, height: int = CLIENT_HEIGHT):
+    """
+    component เดียว: filter + KPI วันที่ + ยอดรวม + trend + donut + ตาราง List (คิดใน browser ทั้งหมด)
+    """
+    # กัน "</script>" ใน label ปิด tag ก่อนเวลา
+    data_json = json.dumps(payload, ensure_ascii=False).replace("</", "<\\/")
+    html = (
+        _TEMPLATE
+        .replace("__PLOTLY_JS__", f"https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js")
+        .replace("__COLORS__", json.dumps(TYPE_COLORS))
+        .replace("__PAYLOAD__", data_json)
+    )
+    components.html(html, height=height, scrolling=False)
+
+
+_TEMPLATE = """
+<html>
+<head>
+  <link href="https://fonts.googleapis.com/css2?family=Prompt:wght@300;400;500;600;700&display=swap" rel="stylesheet">
+  <script src="__PLOTLY_JS__" charset="utf-8"></script>
+  <style>
+    body { margin: 0; font-family: 'Prompt', sans-serif; color: #fff; background: transparent; }
+    .filters { display: grid; grid-template-columns: 2fr 2fr 1.5fr 1.5fr 1.5fr; gap: 16px; margin-bottom: 18px; }
+    .filters label { display: block; font-size: 14px; margin-bottom: 6px; color: rgba(255,255,255,0.85); }
+    .filters input, .filters select {
+      width: 100%; box-sizing: border-box; padding: 8px 10px; border-radius: 8px;
+      border: 1px solid rgba(255,255,255,0.18); background: rgba(255,255,255,0.06); color: #fff;
+      font-family: inherit; color-scheme: dark;
+    }
+    .kpis { display: grid; grid-template-columns: repeat(4, 1fr); gap: 24px; margin-bottom: 18px; }
+    .kpi-card {
+      border: 1px solid rgba(255,255,255,0.18); border-radius: 12px; padding: 12px 14px;
+      background: rgba(255,255,255,0.06); text-align: center;
+    }
+    .kpi-title { font-size: 14px; color: rgba(255,255,255,0.85); margin-bottom: 6px; }
+    .kpi-value { font-size: 22px; line-height: 1.2; }
+    .card {
+      border: 1px solid rgba(255,255,255,0.18); border-radius: 12px; padding: 12px;
+      background: rgba(255,255,255,0.06); overflow: hidden;
+    }
+    h3 { font-weight: 600; margin: 22px 0 10px; }
+    .bottom { display: grid; grid-template-columns: 1.05fr 1.35fr; gap: 24px; }
+    .donut-grid { display: grid; grid-template-columns: 72% 28%; gap: 10px; align-items: center; }
+    .lg-row { display: flex; align-items: center; gap: 10px; font-size: 13px; margin: 10px 0; }
+    .dot { width: 12px; height: 12px; border-radius: 3px; flex: 0 0 12px; }
+    .name { flex: 1; min-width: 0; white-space: nowrap; overflow: hidden; text-overflow: ellipsis; }
+    .pct { opacity: .85; }
+    .table-scroll { max-height: 360px; overflow-y: auto; }
+    table { width: 100%; border-collapse: collapse; }
+    thead th { position: sticky; top: 0; background: rgba(20,20,20,0.95); padding: 10px; text-align: left; }
+    tbody td { padding: 10px; border-bottom: 1px solid rgba(255,255,255,0.08); color: rgba(255,255,255,0.9); }
+    tfoot td {
+      position: sticky; bottom: 0; background: rgba(20,20,20,0.95); padding: 10px;
+      font-weight: 600; border-top: 1px solid rgba(255,255,255,0.2);
+    }
+    .right { text-align: right; }
+    .empty { padding: 16px; opacity: .8; }
+  </style>
+</head>
+<body>
+  <div class="filters">
+    <div><label>From</label><input type="date" id="from"></div>
+    <div><label>To</label><input type="date" id="to"></div>
+    <div><label>Type_End</label><select id="Type_End"></select></div>
+    <div><label>List</label><select id="List"></select></div>
+    <div><label>Channel</label><select id="Channel"></select></div>
+  </div>
+
+  <div class="kpis" id="kpiDays"></div>
+  <div class="kpis" id="kpiSpend"></div>
+
+  <h3>Daily Price Trend</h3>
+  <div class="card"><div id="trend" style="height:420px"></div></div>
+
+  <div class="bottom">
+    <div>
+      <h3>%Share By Type End</h3>
+      <div class="card">
+        <div class="donut-grid">
+          <div id="donut" style="height:320px"></div>
+          <div id="legend"></div>
+        </div>
+      </div>
+    </div>
+    <div>
+      <h3>Summary by List</h3>
+      <div class="card"><div class="table-scroll" id="listTable"></div></div>
+    </div>
+  </div>
+
+<script>
+(function () {
+  const P = __PAYLOAD__;
+  const COLORS = __COLORS__;
+  const DAY_MS = 86400000;
+  const TYPES = { Int16: Int16Array, Int32: Int32Array, Float64: Float64Array };
+
+  // ---------------- decode (base64 -> typed array, ไม่ต้อง parse ทีละค่า) ----------------
+  function decode(col) {
+    const bin = atob(col.data);
+    const bytes = new Uint8Array(bin.length);
+    for (let i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+    return new TYPES[col.type](bytes.buffer);
+  }
+  const C = {};
+  for (const k in P.columns) C[k] = decode(P.columns[k]);
+  const L = P.labels;
+  const start = Date.parse(P.start + "T00:00:00Z");
+
+  const iso = (d) => new Date(start + d * DAY_MS).toISOString().slice(0, 10);
+  const dayOf = (s) => Math.round((Date.parse(s + "T00:00:00Z") - start) / DAY_MS);
+  const fmt = (v, digits = 2) => v.toLocaleString("en-US", { minimumFractionDigits: digits, maximumFractionDigits: digits });
+  const el = (id) => document.getElementById(id);
+
+  // ---------------- filter widgets ----------------
+  const from = el("from"), to = el("to");
+  from.min = to.min = iso(0);
+  from.max = to.max = iso(P.days - 1);
+  from.value = iso(0);
+  to.value = iso(P.days - 1);
+
+  for (const dim of ["Type_End", "List", "Channel"]) {
+    const sel = el(dim);
+    for (const v of ["All", ...L[dim]]) sel.add(new Option(v, v));
+    sel.addEventListener("change", update);
+  }
+  from.addEventListener("change", update);
+  to.addEventListener("change", update);
+
+  // ไม่มี label นี้ใน payload -> -2 (ไม่ตรงกับ code ไหนเลย; -1 คือช่องว่าง)
+  const NO_MATCH = -2;
+  function codeOf(dim) {
+    const v = el(dim).value;
+    if (v === "All") return null;
+    const code = L[dim].indexOf(v);
+    return code >= 0 ? code : NO_MATCH;
+  }
+
+  // ---------------- KPI ----------------
+  function card(title, value) {
+    return '<div class="kpi-card"><div class="kpi-title">' + title + '</div><div class="kpi-value">' + value + "</div></div>";
+  }
+
+  function renderDays(dTo) {
+    const d = new Date(start + dTo * DAY_MS);
+    const inMonth = new Date(Date.UTC(d.getUTCFullYear(), d.getUTCMonth() + 1, 0)).getUTCDate();
+    const passed = d.getUTCDate();
+    el("kpiDays").innerHTML =
+      card("Date of the month", inMonth + " Days") +
+      card("Date Pass", passed + " Days") +
+      card("Balance Date", Math.max(inMonth - passed, 0) + " Days") +
+      card("Date Time Passed", fmt(passed / inMonth * 100) + "%");
+  }
+
+  // ---------------- trend ----------------
+  function renderTrend(days, sums) {
+    if (!days.length) {
+      Plotly.purge("trend");
+      el("trend").innerHTML = '<div class="empty">ยังไม่มีข้อมูลสำหรับกราฟ</div>';
+      return;
+    }
+    const x = days.map(iso), n = sums.length;
+    const avg = sums.reduce((a, b) => a + b, 0) / n;
+    const mx = Math.max(...sums), mn = Math.min(...sums);
+
+    // least squares บน index (เหมือน np.polyfit(xi, y, 1))
+    let trend = sums;
+    if (n >= 2) {
+      const xm = (n - 1) / 2;
+      let sxy = 0, sxx = 0;
+      for (let i = 0; i < n; i++) { sxy += (i - xm) * (sums[i] - avg); sxx += (i - xm) * (i - xm); }
+      const m = sxy / sxx, b = avg - m * xm;
+      trend = sums.map((_, i) => m * i + b);
+    }
+
+    const hline = (y, color) => ({ type: "line", xref: "paper", x0: 0, x1: 1, y0: y, y1: y, line: { dash: "dash", color: color } });
+    const note = (y, text, pos) => ({ xref: "paper", x: 0, xanchor: "left", y: y, yanchor: pos, text: text, showarrow: false });
+    const pad = (mx - mn) * 0.05;
+
+    Plotly.react("trend", [
+      { x: x, y: sums, mode: "lines+markers", name: "Price", line: { shape: "spline", smoothing: 1.2 } },
+      { x: x, y: trend, mode: "lines", name: "Trend", line: { dash: "dash", shape: "spline", smoothing: 1.2 } },
+    ], {
+      height: 420,
+      margin: { l: 40, r: 10, t: 10, b: 25 },
+      paper_bgcolor: "rgba(0,0,0,0)",
+      plot_bgcolor: "rgba(0,0,0,0)",
+      font: { color: "white" },
+      showlegend: false,
+      shapes: [hline(mx, "red"), hline(avg, "yellow"), hline(mn, "green")],
+      annotations: [note(mx, "Max: " + fmt(mx), "bottom"), note(avg, "Average: " + fmt(avg), "top"), note(mn, "Min: " + fmt(mn), "top")],
+      yaxis: { range: [mn - pad, mx + pad], gridcolor: "rgba(255,255,255,0.1)" },
+      xaxis: { type: "date", tickformat: "%d %b %Y", ticks: "outside", gridcolor: "rgba(255,255,255,0.1)" },
+    }, { displayModeBar: false, responsive: true });
+  }
+
+  // ---------------- donut ----------------
+  function renderDonut(byType) {
+    const rows = [];
+    byType.forEach((v, i) => { if (v !== 0) rows.push([L.Type_End[i], v]); });
+    rows.sort((a, b) => b[1] - a[1]);
+    const total = rows.reduce((a, r) => a + r[1], 0);
+
+    if (!rows.length) {
+      Plotly.purge("donut");
+      el("legend").innerHTML = '<div class="empty">ไม่มีข้อมูลสำหรับกราฟ</div>';
+      return;
+    }
+
+    Plotly.react("donut", [{
+      type: "pie", hole: 0.6, labels: rows.map((r) => r[0]), values: rows.map((r) => r[1]),
+      textposition: "inside", texttemplate: "%{percent:.2%}", insidetextorientation: "horizontal",
+      marker: { colors: COLORS.slice(0, rows.length) }, sort: false,
+    }], {
+      height: 320, margin: { l: 10, r: 10, t: 10, b: 10 }, showlegend: false,
+      paper_bgcolor: "rgba(0,0,0,0)", font: { color: "white" },
+    }, { displayModeBar: false, responsive: true });
+
+    const legend = el("legend");
+    legend.innerHTML = "";
+    rows.forEach((r, i) => {
+      const row = document.createElement("div");
+      row.className = "lg-row";
+      row.innerHTML = '<span class="dot"></span><span class="name"></span><span class="pct"></span>';
+      row.children[0].style.background = COLORS[i % COLORS.length];
+      row.children[1].textContent = r[0];
+      row.children[2].textContent = fmt(r[1] / total * 100) + "%";
+      legend.appendChild(row);
+    });
+  }
+
+  // ---------------- List table ----------------
+  function renderListTable(byList, cntList) {
+    const rows = [];
+    byList.forEach((v, i) => { if (cntList[i] > 0) rows.push([L.List[i], cntList[i], v]); });
+    rows.sort((a, b) => b[2] - a[2]);
+    if (!rows.length) {
+      el("listTable").innerHTML = '<div class="empty">ไม่มีข้อมูลสำหรับสรุป List</div>';
+      return;
+    }
+    const sum = rows.reduce((a, r) => a + r[2], 0);
+    const cnt = rows.reduce((a, r) => a + r[1], 0);
+    const head = ["Index", "List", "Record_Count", "Total", "Average_Pay", "Percent"];
+
+    const table = document.createElement("table");
+    table.innerHTML = "<thead><tr>" + head.map((h) => "<th>" + h + "</th>").join("") + "</tr></thead><tbody></tbody><tfoot></tfoot>";
+    const addRow = (parent, cells) => {
+      const tr = parent.insertRow();
+      cells.forEach((c, i) => {
+        const td = tr.insertCell();
+        td.textContent = c;
+        if (i !== 1) td.className = "right";
+      });
+    };
+    const tbody = table.tBodies[0];
+    rows.forEach((r, i) => addRow(tbody, [i + 1, r[0], r[1], fmt(r[2]), fmt(r[2] / r[1]), fmt(r[2] / sum * 100) + "%"]));
+    addRow(table.tFoot, [rows.length + 1, "Total", cnt, fmt(sum), fmt(cnt ? sum / cnt : 0), "100.00%"]);
+
+    el("listTable").innerHTML = "";
+    el("listTable").appendChild(table);
+  }
+
+  // ---------------- recompute (1 รอบต่อการเปลี่ยน filter) ----------------
+  function update() {
+    let d0 = dayOf(from.value || iso(0)), d1 = dayOf(to.value || iso(P.days - 1));
+    if (d0 > d1) [d0, d1] = [d1, d0];
+    d0 = Math.max(d0, 0);
+    d1 = Math.min(d1, P.days - 1);
+
+    const fType = codeOf("Type_End"), fList = codeOf("List"), fChannel = codeOf("Channel");
+    const daily = new Float64Array(P.days), dailyN = new Int32Array(P.days);
+    const byType = new Float64Array(L.Type_End.length);
+    const byList = new Float64Array(L.List.length), cntList = new Int32Array(L.List.length);
+    let total = 0, count = 0;
+
+    const day = C.day, tot = C.total, n = C.n;
+    for (let i = 0; i < P.rows; i++) {
+      const d = day[i];
+      if (d < d0 || d > d1) continue;
+      if (fType !== null && C.Type_End[i] !== fType) continue;
+      if (fList !== null && C.List[i] !== fList) continue;
+      if (fChannel !== null && C.Channel[i] !== fChannel) continue;
+
+      const v = tot[i];
+      daily[d] += v; dailyN[d] += n[i];
+      total += v; count += n[i];
+      if (C.Type_End[i] >= 0) byType[C.Type_End[i]] += v;
+      if (C.List[i] >= 0) { byList[C.List[i]] += v; cntList[C.List[i]] += n[i]; }
+    }
+
+    const days = [], sums = [];
+    for (let d = d0; d <= d1; d++) if (dailyN[d] > 0) { days.push(d); sums.push(daily[d]); }
+
+    renderDays(d1);
+    el("kpiSpend").innerHTML =
+      card("Total Spend", fmt(total) + " Bath") +
+      card("Records", count.toLocaleString("en-US")) +
+      card("Average Pay : Record", fmt(count ? total / count : 0) + " Bath") +
+      card("Average Pay : Day", fmt(total / (d1 - d0 + 1)) + " Bath");
+    renderTrend(days, sums);
+    renderDonut(byType);
+    renderListTable(byList, cntList);
+  }
+
+  update();
+})();
+</script>
+</body>
+</html>
+"""
@@ -1,8 +1,28 @@
 # data_loader.py
+import os
+import re
+import time
+from functools import partial
+
 import pandas as pd
 import gspread
 import streamlit as st
 from google.oauth2.service_account import Credentials
+from gspread.utils import rowcol_to_a1
+
+from aggregate_store import AggregateStore, get_aggregate_store
+from data_meta import DATE_COL, META_ATTR, build_data_meta, parse_dates
+from fake_sheet import FakeClient
+from money import to_money
+from shared_cache import SharedSnapshotCache
+from tenants import (
+    DEFAULT_TENANT,
+    ClientPool,
+    TenantCacheRegistry,
+    TenantConfig,
+    load_tenants,
+)
+from write_queue import WriteQueue
 
 # ---------------- CONFIG ----------------
 SCOPE = [
@@ -12,48 +32,204 @@ SCOPE = [
 
 SHEET_ID = "11BH6-8mIp3tuN1YAGi7rC6qAdKUdOnmBaE2UZwLw6VI"
 SHEET_NAME = "Month_25"
+MONTH_SHEET_PATTERN = r"^Month_\d+$"  # worksheet เดือนเก่าที่ใช้ backfill
 
-MAIN_RANGE = "A:F"
+MAIN_RANGE = "A:F"            # ตารางหลัก (append ใช้หาแถวสุดท้าย)
+HEADER_RANGE = "A1:F1"
+EXTENT_RANGE = "A2:A"         # คอลัมน์ Date: ความยาว = จำนวนแถวข้อมูลจริง
+MAIN_COLS = ["Date", "List", "Type", "Type_End", "Channel", "Price"]  # คอลัมน์ที่แดชบอร์ดใช้
+NUMERIC_COLS = ["Price"]      # ดึงเป็นตัวเลข (UNFORMATTED_VALUE) ไม่ต้อง parse "฿1,234"
 EXTRA_RANGE = "M2:Q3"
 EXTRA_COLS = ["M", "N", "O", "P", "Q"]
 
-# ---------------- AUTH ----------------
+# ชี้ไปที่ folder ของ fake_sheet.py เพื่อรันแบบ offline (ไม่ต้องมี service account)
+FAKE_SHEET_DIR = os.environ.get("PRICE_FAKE_SHEET_DIR")
+
+# ---------------- TENANTS ----------------
 @st.cache_resource
-def get_gspread_client():
+def get_tenants() -> dict:
+    # ชีตเดิม (SHEET_ID / SHEET_NAME) = tenant "default" เมื่อ secrets ไม่มี [tenants] (deployment เดิม เปิดได้เหมือนเดิม)
+    return load_tenants(st.secrets, default=TenantConfig(DEFAULT_TENANT, SHEET_ID, SHEET_NAME, public=True))
+
+
+def get_tenant(tenant: str = DEFAULT_TENANT) -> TenantConfig:
+    tenants = get_tenants()
+    if tenant not in tenants:
+        raise KeyError(f"ไม่พบ tenant '{tenant}'")
+    return tenants[tenant]
+
+
+# ---------------- AUTH ----------------
+def _authorize(tenant: TenantConfig):
+    if FAKE_SHEET_DIR:
+        return FakeClient(FAKE_SHEET_DIR)
+
     creds = Credentials.from_service_account_info(
-        st.secrets["gcp_service_account"],
+        st.secrets[tenant.credentials],
         scopes=SCOPE,
     )
     return gspread.authorize(creds)
 
+
+@st.cache_resource
+def get_client_pool() -> ClientPool:
+    # ✅ 1 pool ต่อ process: client / HTTP session ต่อ service account ถูกใช้ซ้ำทุก tenant
+    return ClientPool(_authorize)
+
+
+def get_gspread_client(tenant: str = DEFAULT_TENANT):
+    return get_client_pool().client(get_tenant(tenant))
+
+
+def get_spreadsheet(tenant: str = DEFAULT_TENANT):
+    return get_client_pool().spreadsheet(get_tenant(tenant))
+
 # ---------------- DATA LOADER ----------------
-@st.cache_data(ttl=300, show_spinner=False)  # cache 5 นาที
-def load_data() -> pd.DataFrame:
-    client = get_gspread_client()
-    sheet = client.open_by_key(SHEET_ID).worksheet(SHEET_NAME)
+def _column_runs(positions: list) -> list:
+    """
+    [0, 1, 2, 5] -> [(0, 2), (5, 5)] (คอลัมน์ติดกันขอเป็น range เดียว)
+    """
+    runs = []
+    for p in positions:
+        if runs and p == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], p)
+        else:
+            runs.append((p, p))
+    return runs
 
-    # ---------- Load main table ----------
-    values = sheet.get(MAIN_RANGE)
 
-    if not values or len(values) < 2:
+def read_main_table(sheet) -> pd.DataFrame:
+    """
+    อ่านตารางหลักของ worksheet (ใช้ทั้งเดือนปัจจุบันและตอน backfill เดือนเก่า)
+
+    1) batch_get header + คอลัมน์ Date -> รู้จำนวนแถวจริง
+    2) batch_get เฉพาะคอลัมน์ใน MAIN_COLS ในช่วงแถวนั้น (ตัวเลขแบบ unformatted, วันที่เป็นข้อความ)
+    """
+    header, dates = sheet.batch_get([HEADER_RANGE, EXTENT_RANGE], major_dimension="COLUMNS")
+    header = [str(c[0]).strip() if c else "" for c in header]
+    n_rows = len(dates[0]) if dates else 0
+
+    wanted = [i for i, name in enumerate(header) if name in MAIN_COLS]
+    if not wanted:
         return pd.DataFrame()
 
-    header, *rows = values
-    df = pd.DataFrame(rows, columns=header)
+    if n_rows == 0:
+        # มีแต่ header -> frame ว่างที่ยังมีคอลัมน์ (ฟอร์มเพิ่มรายการ / แถว pending ต้องรู้คอลัมน์และ dtype)
+        return pd.DataFrame({
+            header[i]: pd.Series(dtype="float64" if header[i] in NUMERIC_COLS else "str")
+            for i in wanted
+        })
 
-    # ---------- Clean data ----------
-    df = (
-        df.replace("", pd.NA)
-          .apply(lambda col: col.str.strip() if col.dtype == "object" else col)
-          .dropna(how="all")
+    last_row = n_rows + 1
+    runs = _column_runs(wanted)
+    blocks = sheet.batch_get(
+        [f"{rowcol_to_a1(2, a + 1)}:{rowcol_to_a1(last_row, b + 1)}" for a, b in runs],
+        major_dimension="COLUMNS",
+        value_render_option="UNFORMATTED_VALUE",
+        date_time_render_option="FORMATTED_STRING",
     )
 
+    # API ตัดค่าว่างท้ายคอลัมน์ทิ้ง -> เติม None ให้ยาวเท่ากัน
+    data = {}
+    for (a, b), block in zip(runs, blocks):
+        block = list(block) + [[]] * (b - a + 1 - len(block))
+        for pos, values in zip(range(a, b + 1), block):
+            values = list(values) + [None] * (n_rows - len(values))
+            if header[pos] in NUMERIC_COLS:
+                # เซลล์ตัวเลขมาเป็น int/float แล้ว -> to_money ใช้ตรงๆ, parse เฉพาะเซลล์ที่เป็นข้อความ
+                data[header[pos]] = to_money(pd.Series(values, dtype="object"))
+            else:
+                col = pd.Series(values, dtype="str")
+                data[header[pos]] = col.mask(col == "")
+
+    df = pd.DataFrame(data)
+
     if "Date" in df.columns:
         df = df[df["Date"].notna()]
     else:
         st.warning("⚠️ ไม่พบคอลัมน์ Date")
 
-    df = df.reset_index(drop=True)
+    return df.reset_index(drop=True)
+
+
+def backfill_closed_months(book, store: AggregateStore, current_sheet: str = SHEET_NAME):
+    """
+    อ่าน worksheet เดือนเก่า (ชื่อตาม MONTH_SHEET_PATTERN) ที่ยังไม่เคยโหลด เข้า aggregate store ครั้งเดียว
+    """
+    done = store.loaded_sheets()
+
+    for ws in book.worksheets():
+        if ws.title == current_sheet or ws.title in done or not re.match(MONTH_SHEET_PATTERN, ws.title):
+            continue
+        store.close_finished_months(read_main_table(ws), source=ws.title)
+        store.mark_sheet_loaded(ws.title)
+
+
+@st.cache_resource(show_spinner=False)
+def get_backfilled_store(tenant: str = DEFAULT_TENANT) -> AggregateStore:
+    # ✅ ทำครั้งเดียวต่อ process ต่อ tenant; worksheet ที่เคยโหลดแล้วจะถูกข้าม (จำไว้ใน store)
+    config = get_tenant(tenant)
+    store = get_aggregate_store(config.agg_db_path)
+    try:
+        backfill_closed_months(get_spreadsheet(tenant), store, current_sheet=config.sheet_name)
+    except Exception as e:
+        st.warning(f"⚠️ backfill เดือนเก่าไม่สำเร็จ: {e}")
+    return store
+
+
+@st.cache_resource
+def get_write_queue(tenant: str = DEFAULT_TENANT) -> WriteQueue:
+    # ✅ คิวเดียวต่อ process ต่อ tenant: ทุก session ของ tenant เขียนรวมเป็น batch เดียวกัน
+    sheet_name = get_tenant(tenant).sheet_name
+    return WriteQueue(
+        lambda: get_spreadsheet(tenant).worksheet(sheet_name),
+        table_range=MAIN_RANGE,
+    )
+
+
+@st.cache_resource
+def get_tenant_caches() -> TenantCacheRegistry:
+    return TenantCacheRegistry()
+
+
+def get_shared_cache(tenant: str = DEFAULT_TENANT) -> SharedSnapshotCache:
+    return get_tenant_caches().get(get_tenant(tenant))
+
+
+def load_data(tenant: str = DEFAULT_TENANT) -> pd.DataFrame:
+    """
+    frame ล่าสุดของ tenant จาก shared cache (TTL ตาม tenant ใช้ร่วมกันทุก worker process)
+    มีแค่ worker เดียวที่ fetch ชีตจริงเมื่อหมดอายุ ที่เหลือ memory-map snapshot เดียวกัน
+    """
+    return get_shared_cache(tenant).get(partial(fetch_sheet_frame, tenant))
+
+
+def fetch_sheet_frame(tenant: str = DEFAULT_TENANT) -> pd.DataFrame:
+    config = get_tenant(tenant)
+    sheet = get_spreadsheet(tenant).worksheet(config.sheet_name)
+
+    # ---------- Load main table ----------
+    # batch ของ write queue ที่ยืนยันก่อน read_started_at อยู่ใน snapshot แน่นอน
+    # ส่งหลัง fetched_at ไม่อยู่แน่นอน; ที่คาบเกี่ยวช่วงอ่าน apply_pending เทียบกับท้าย snapshot เอง
+    read_started_at = time.time()
+    df = read_main_table(sheet)
+    fetched_at = time.time()
+    if df.columns.empty:
+        return df
+
+    df.attrs["read_started_at"] = read_started_at
+    df.attrs["fetched_at"] = fetched_at
+    df.attrs["main_cols"] = df.columns.tolist()
+
+    # parse วันที่ครั้งเดียวต่อ snapshot (ทุก rerun / ทุก worker ใช้คอลัมน์นี้ต่อ)
+    if "Date" in df.columns:
+        df[DATE_COL] = parse_dates(df["Date"])
+
+    # ---------- เดือนที่จบแล้ว -> aggregate store (ครั้งเดียวต่อเดือน) ----------
+    try:
+        get_backfilled_store(tenant).close_finished_months(df, source=config.sheet_name)
+    except Exception as e:
+        st.warning(f"⚠️ บันทึกยอดเดือนที่ปิดแล้วไม่สำเร็จ: {e}")
 
     # ---------- Load extra columns (M:Q) ----------
     df_extra = pd.DataFrame([[pd.NA]*5, [pd.NA]*5], columns=EXTRA_COLS)
@@ -76,6 +252,11 @@ def load_data() -> pd.DataFrame:
         if col not in df.columns:
             df[col] = pd.NA
 
-    df.loc[0:1, EXTRA_COLS] = df_extra.values
+    n_extra = min(len(df), len(df_extra))  # ชีตที่ยังไม่มีแถว -> ไม่สร้างแถวปลอมมาเก็บ M-Q
+    if n_extra:
+        df.loc[:n_extra - 1, EXTRA_COLS] = df_extra.values[:n_extra]
+
+    # ---------- ตัวเลือก filter / ช่วงวันที่ / ปฏิทิน (ครั้งเดียวต่อ data version) ----------
+    df.attrs[META_ATTR] = build_data_meta(df, version=f"{fetched_at:.6f}").to_attrs()
 
     return df
@@ -0,0 +1,159 @@
+# data_meta.py
+import calendar
+from dataclasses import dataclass, field
+from datetime import date
+
+import pandas as pd
+
+# ---------------- CONFIG ----------------
+OPTION_COLS = ("Type", "Type_End", "List", "Channel")  # selectbox ของ filter + ฟอร์มเพิ่มรายการ
+DATE_COL = "date_dt"
+META_ATTR = "meta"
+
+
+def parse_dates(values) -> pd.Series:
+    return pd.to_datetime(values, dayfirst=True, errors="coerce")
+
+
+def add_date_dt(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    เติมคอลัมน์ date_dt (snapshot มีมาแล้ว; parse เฉพาะแถว pending ที่ต่อท้ายและยังไม่มี)
+    """
+    if df is None or "Date" not in df.columns:
+        return df
+
+    if DATE_COL not in df.columns:
+        out = df.copy()
+        out[DATE_COL] = parse_dates(df["Date"])
+        return out
+
+    missing = df[DATE_COL].isna() & df["Date"].notna()
+    if not missing.any():
+        return df
+
+    out = df.copy()
+    out.loc[missing, DATE_COL] = parse_dates(df.loc[missing, "Date"])
+    return out
+
+
+def _month_days(lo: date, hi: date) -> dict:
+    # "YYYY-MM" -> จำนวนวันในเดือน ทุกเดือนตั้งแต่ lo ถึง hi
+    out = {}
+    y, m = lo.year, lo.month
+    while (y, m) <= (hi.year, hi.month):
+        out[f"{y:04d}-{m:02d}"] = calendar.monthrange(y, m)[1]
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    return out
+
+
+@dataclass
+class DataMeta:
+    """
+    ข้อมูลประกอบ widget ที่ขึ้นกับ data version เท่านั้น (ไม่ขึ้นกับ filter ของผู้ใช้)
+    สร้างครั้งเดียวตอน fetch แล้วเก็บใน df.attrs ไปกับ snapshot
+    """
+
+    version: str = ""
+    rows: int = 0                                  # จำนวนแถวของ snapshot ที่ใช้สร้าง
+    min_date: date = None
+    max_date: date = None
+    options: dict = field(default_factory=dict)    # คอลัมน์ -> ค่าที่เรียงแล้ว
+    month_days: dict = field(default_factory=dict)  # "YYYY-MM" -> จำนวนวัน
+
+    def days_in_month(self, d) -> int:
+        key = f"{d.year:04d}-{d.month:02d}"
+        days = self.month_days.get(key)
+        return days if days is not None else calendar.monthrange(d.year, d.month)[1]
+
+    # ---------------- attrs (json) ----------------
+    def to_attrs(self) -> dict:
+        return {
+            "version": self.version,
+            "rows": self.rows,
+            "min_date": self.min_date.isoformat() if self.min_date else None,
+            "max_date": self.max_date.isoformat() if self.max_date else None,
+            "options": self.options,
+            "month_days": self.month_days,
+        }
+
+    @classmethod
+    def from_attrs(cls, raw: dict) -> "DataMeta":
+        return cls(
+            version=raw.get("version", ""),
+            rows=raw.get("rows", 0),
+            min_date=date.fromisoformat(raw["min_date"]) if raw.get("min_date") else None,
+            max_date=date.fromisoformat(raw["max_date"]) if raw.get("max_date") else None,
+            options=dict(raw.get("options", {})),
+            month_days=dict(raw.get("month_days", {})),
+        )
+
+    # ---------------- แถวที่ต่อท้าย snapshot ----------------
+    def extend(self, tail: pd.DataFrame) -> "DataMeta":
+        """
+        รวมแถวที่ต่อท้าย snapshot (pending / confirmed ที่ยังไม่ refresh) เข้าไป -> O(แถวใหม่)
+        """
+        if tail is None or tail.empty:
+            return self
+
+        options = dict(self.options)
+        for col in OPTION_COLS:
+            if col in tail.columns:
+                new = set(tail[col].dropna().astype(str)) - set(options.get(col, []))
+                if new:
+                    options[col] = sorted([*options.get(col, []), *new])
+
+        dates = tail[DATE_COL].dropna() if DATE_COL in tail.columns else pd.Series(dtype="datetime64[ns]")
+        lo, hi = self.min_date, self.max_date
+        if not dates.empty:
+            lo = min(filter(None, [lo, dates.min().date()]))
+            hi = max(filter(None, [hi, dates.max().date()]))
+
+        return DataMeta(
+            version=f"{self.version}+{len(tail)}",
+            rows=self.rows + len(tail),
+            min_date=lo,
+            max_date=hi,
+            options=options,
+            month_days=_month_days(lo, hi) if lo else {},
+        )
+
+
+def build_data_meta(df: pd.DataFrame, version: str = "") -> DataMeta:
+    """
+    สแกน frame ครั้งเดียว (ตอน fetch): ตัวเลือกที่เรียงแล้ว, ช่วงวันที่, ปฏิทินของทุกเดือนในช่วง
+    """
+    if df is None or df.empty:
+        return DataMeta(version=version)
+
+    options = {
+        col: sorted(df[col].dropna().astype(str).unique().tolist())
+        for col in OPTION_COLS if col in df.columns
+    }
+
+    dates = df[DATE_COL].dropna() if DATE_COL in df.columns else parse_dates(df["Date"]).dropna()
+    if dates.empty:
+        return DataMeta(version=version, rows=len(df), options=options)
+
+    lo, hi = dates.min().date(), dates.max().date()
+    return DataMeta(
+        version=version,
+        rows=len(df),
+        min_date=lo,
+        max_date=hi,
+        options=options,
+        month_days=_month_days(lo, hi),
+    )
+
+
+def get_data_meta(df: pd.DataFrame) -> DataMeta:
+    """
+    meta ของ frame ปัจจุบัน: อ่านจาก attrs ของ snapshot + รวมแถวที่ต่อท้าย (ไม่สแกน frame ทั้งก้อน)
+    """
+    raw = df.attrs.get(META_ATTR) if df is not None else None
+    if not raw:
+        return build_data_meta(add_date_dt(df))
+
+    meta = DataMeta.from_attrs(raw)
+    if len(df) > meta.rows:
+        meta = meta.extend(add_date_dt(df.iloc[meta.rows:]))
+    return meta
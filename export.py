@@ -0,0 +1,98 @@
+# export.py
+import io
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+try:
+    from openpyxl import Workbook
+except ImportError:  # XLSX เป็น optional
+    Workbook = None
+
+# ---------------- CONFIG ----------------
+CHUNK_ROWS = 50_000
+
+MIME_TYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def available_formats() -> list:
+    formats = ["csv", "parquet"]
+    if Workbook is not None:
+        formats.append("xlsx")
+    return formats
+
+
+def iter_chunks(df: pd.DataFrame, chunk_rows: int = CHUNK_ROWS):
+    """
+    แบ่ง df เป็นช่วงแถว (iloc slice = view ไม่ copy ทั้ง frame)
+    """
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+# ---------------- writers ----------------
+def _write_csv(df: pd.DataFrame, out, chunk_rows: int):
+    out.write("\ufeff".encode("utf-8"))  # BOM ให้ Excel อ่านภาษาไทยถูก
+    header = True
+    for chunk in iter_chunks(df, chunk_rows):
+        out.write(chunk.to_csv(index=False, header=header).encode("utf-8"))
+        header = False
+    if header:
+        out.write(df.iloc[:0].to_csv(index=False).encode("utf-8"))
+
+
+def _as_arrow_ready(chunk: pd.DataFrame, text_cols: list) -> pd.DataFrame:
+    # คอลัมน์ object (ข้อความปนค่าว่างจากชีต) -> string ให้ schema ทุก chunk ตรงกัน
+    chunk = chunk.astype({c: "string" for c in text_cols}) if text_cols else chunk
+    return chunk.rename(columns=str)
+
+
+def _write_parquet(df: pd.DataFrame, out, chunk_rows: int):
+    text_cols = [c for c, t in df.dtypes.items() if t == object]
+    schema = pa.Schema.from_pandas(_as_arrow_ready(df.iloc[:0], text_cols), preserve_index=False)
+    with pq.ParquetWriter(out, schema) as writer:
+        for chunk in iter_chunks(df, chunk_rows):
+            table = pa.Table.from_pandas(_as_arrow_ready(chunk, text_cols), schema=schema, preserve_index=False)
+            writer.write_table(table)
+
+
+def _xlsx_cell(v):
+    return None if v is None or (not isinstance(v, str) and pd.isna(v)) else v
+
+
+def _write_xlsx(df: pd.DataFrame, out, chunk_rows: int):
+    if Workbook is None:
+        raise RuntimeError("ต้องติดตั้ง openpyxl ก่อน export เป็น XLSX")
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("data")
+    ws.append([str(c) for c in df.columns])
+    for chunk in iter_chunks(df, chunk_rows):
+        for row in chunk.itertuples(index=False, name=None):
+            ws.append([_xlsx_cell(v) for v in row])
+    wb.save(out)
+
+
+_WRITERS = {
+    "csv": _write_csv,
+    "parquet": _write_parquet,
+    "xlsx": _write_xlsx,
+}
+
+
+def export_frame(df: pd.DataFrame, fmt: str, chunk_rows: int = CHUNK_ROWS) -> bytes:
+    """
+    เขียน df เป็นไฟล์ fmt ทีละ chunk แล้วคืน bytes
+    (st.download_button รับ callable ที่คืน bytes; ไฟล์ถูกสร้างตอนกดเท่านั้น ไม่ใช่ทุก rerun)
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"ไม่รองรับไฟล์ {fmt}")
+
+    out = io.BytesIO()
+    _WRITERS[fmt](df if df is not None else pd.DataFrame(), out, chunk_rows)
+    return out.getvalue()
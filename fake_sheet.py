@@ -0,0 +1,271 @@
+# fake_sheet.py
+# Google Sheet ปลอมแบบ offline (1 worksheet = 1 ไฟล์ CSV) ใช้แทน gspread ตอนทดสอบ
+#
+#   PRICE_FAKE_SHEET_DIR=.cache/fake_sheet streamlit run main.py
+#   python fake_sheet.py .cache/fake_sheet      # สร้างข้อมูลตัวอย่าง
+import csv
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import numpy as np
+from gspread.utils import a1_range_to_grid_range
+
+from money import parse_money
+
+try:
+    import fcntl
+except ImportError:  # Windows: lock ได้แค่ภายใน process
+    fcntl = None
+
+# ---------------- CONFIG ----------------
+MAIN_HEADER = ["Date", "List", "Type", "Type_End", "Channel", "Price"]
+EXTRA_HEADER = ["Month", "Days", "Usable Income", "Expenses", "Balance"]  # M1:Q1
+
+_SERIAL_EPOCH = date(1899, 12, 30)  # วันที่ 0 ของ serial number ใน Google Sheets
+
+_file_locks = {}
+_file_locks_guard = threading.Lock()
+
+
+@contextmanager
+def _lock_for(path: str):
+    # thread ใน process เดียวกัน + process อื่น (หลาย streamlit worker เขียนชีตเดียวกัน)
+    with _file_locks_guard:
+        lock = _file_locks.setdefault(os.path.abspath(path), threading.Lock())
+    with lock, open(f"{path}.lock", "a+") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _trim(rows: list) -> list:
+    # เหมือน Sheets API: ตัดแถว/คอลัมน์ว่างท้ายทิ้ง
+    rows = [list(r) for r in rows]
+    for r in rows:
+        while r and r[-1] == "":
+            r.pop()
+    while rows and not rows[-1]:
+        rows.pop()
+    return rows
+
+
+def _unformat(rows: list, date_time_render_option=None) -> list:
+    """
+    เลียนแบบ UNFORMATTED_VALUE: เงิน/ตัวเลข -> float, วันที่ dd/mm/yyyy -> serial number
+    (ยกเว้นขอ date_time_render_option="FORMATTED_STRING" ซึ่งจะคืนวันที่เป็นข้อความเหมือนเดิม)
+    """
+    flat = [v for r in rows for v in r]
+    if not flat:
+        return rows
+
+    numbers, ok = parse_money(flat)
+    out, i = [], 0
+    for r in rows:
+        row = []
+        for v in r:
+            if ok[i]:
+                v = float(numbers[i])
+            elif date_time_render_option != "FORMATTED_STRING" and v.count("/") == 2:
+                try:
+                    d, m, y = (int(x) for x in v.split("/"))
+                    v = float((date(y, m, d) - _SERIAL_EPOCH).days)
+                except ValueError:
+                    pass
+            row.append(v)
+            i += 1
+        out.append(row)
+    return out
+
+
+class FakeWorksheet:
+    """
+    รองรับเฉพาะ method ที่แอปใช้: get / batch_get / append_rows / title / row_count / col_count
+    """
+
+    def __init__(self, path: str, title: str):
+        self.path = path
+        self.title = title
+
+    def _read_grid(self) -> list:
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, newline="", encoding="utf-8") as f:
+            return [row for row in csv.reader(f)]
+
+    def _write_grid(self, grid: list):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows(grid)
+        os.replace(tmp, self.path)
+
+    @property
+    def row_count(self) -> int:
+        return max(len(self._read_grid()), 1000)
+
+    @property
+    def col_count(self) -> int:
+        return 26
+
+    def get(
+        self,
+        range_name: str = None,
+        major_dimension: str = None,
+        value_render_option: str = None,
+        date_time_render_option: str = None,
+        **kwargs,
+    ) -> list:
+        return self._get(self._read_grid(), range_name, major_dimension, value_render_option, date_time_render_option)
+
+    def batch_get(
+        self,
+        ranges,
+        major_dimension: str = None,
+        value_render_option: str = None,
+        date_time_render_option: str = None,
+    ) -> list:
+        grid = self._read_grid()  # อ่านไฟล์ครั้งเดียวต่อ batch เหมือน 1 API call
+        return [
+            self._get(grid, r, major_dimension, value_render_option, date_time_render_option)
+            for r in ranges
+        ]
+
+    @staticmethod
+    def _get(grid, range_name, major_dimension, value_render_option, date_time_render_option) -> list:
+        if range_name:
+            g = a1_range_to_grid_range(range_name)
+            r0, r1 = g.get("startRowIndex", 0), g.get("endRowIndex", len(grid))
+            c0 = g.get("startColumnIndex", 0)
+            c1 = g.get("endColumnIndex", max((len(r) for r in grid), default=0))
+            grid = [row[c0:c1] for row in grid[r0:r1]]
+
+        rows = _trim(grid)
+        if major_dimension == "COLUMNS":
+            width = max((len(r) for r in rows), default=0)
+            rows = _trim(
+                [[r[c] if c < len(r) else "" for r in rows] for c in range(width)]
+            )
+
+        if value_render_option == "UNFORMATTED_VALUE":
+            rows = _unformat(rows, date_time_render_option)
+        return rows
+
+    def append_rows(self, values, value_input_option=None, table_range=None, **kwargs) -> dict:
+        with _lock_for(self.path):
+            grid = self._read_grid()
+
+            # แถวสุดท้ายที่มีข้อมูลในช่วงตาราง (ค่าเริ่มต้น A:F)
+            g = a1_range_to_grid_range(table_range or "A:F")
+            c0 = g.get("startColumnIndex", 0)
+            c1 = g.get("endColumnIndex", c0 + len(MAIN_HEADER))
+            last = 0
+            for i, row in enumerate(grid):
+                if any(v != "" for v in row[c0:c1]):
+                    last = i + 1
+
+            for offset, values_row in enumerate(values):
+                i = last + offset
+                while len(grid) <= i:
+                    grid.append([])
+                row = grid[i]
+                row.extend([""] * (c1 - len(row)))
+                row[c0:c0 + len(values_row)] = ["" if v is None else str(v) for v in values_row]
+
+            self._write_grid(grid)
+
+        return {"updates": {"updatedRows": len(values)}}
+
+
+class FakeSpreadsheet:
+    def __init__(self, folder: str):
+        self.folder = folder
+
+    def worksheet(self, title: str) -> FakeWorksheet:
+        path = os.path.join(self.folder, f"{title}.csv")
+        if not os.path.exists(path):
+            raise KeyError(f"ไม่พบ worksheet {title} ใน {self.folder}")
+        return FakeWorksheet(path, title)
+
+    def worksheets(self) -> list:
+        names = sorted(f[:-4] for f in os.listdir(self.folder) if f.endswith(".csv"))
+        return [FakeWorksheet(os.path.join(self.folder, f"{n}.csv"), n) for n in names]
+
+
+class FakeClient:
+    """
+    แทน gspread client: open_by_key(key) -> folder/<key> ถ้ามี (หลาย tenant), ไม่มีก็ใช้ folder หลัก
+    """
+
+    def __init__(self, folder: str):
+        self.folder = folder
+
+    def open_by_key(self, key: str) -> FakeSpreadsheet:
+        sub = os.path.join(self.folder, key)
+        return FakeSpreadsheet(sub if os.path.isdir(sub) else self.folder)
+
+
+# ---------------- SAMPLE DATA ----------------
+def seed_fake_sheet(
+    folder: str,
+    title: str,
+    start: date,
+    end: date,
+    rows_per_day: int = 6,
+    seed: int = 0,
+    usable_income: float = 30_000.0,
+):
+    """
+    สร้าง worksheet ตัวอย่าง (รูปแบบเดียวกับชีตจริง: วันที่ dd/mm/yyyy, ราคา ฿1,234.00, M2:Q2)
+    """
+    rng = np.random.default_rng(seed)
+    lists = ["Food", "Coffee", "Taxi", "BTS", "Rent", "Shopping", "Bills", "Fun"]
+    types = {"Food": "Need", "Coffee": "Want", "Taxi": "Need", "BTS": "Need",
+             "Rent": "Need", "Shopping": "Want", "Bills": "Need", "Fun": "Want"}
+    channels = ["Cash", "Card", "PromptPay"]
+
+    grid = [MAIN_HEADER + [""] * 6 + EXTRA_HEADER]
+    total = 0.0
+    day = start
+    while day <= end:
+        for _ in range(rng.poisson(rows_per_day)):
+            item = lists[rng.integers(len(lists))]
+            price = round(float(rng.gamma(2.0, 120.0)), 2)
+            total += price
+            grid.append([
+                day.strftime("%d/%m/%Y"),
+                item,
+                types[item],
+                "Save" if rng.random() < 0.05 else types[item],
+                channels[rng.integers(len(channels))],
+                f"฿{price:,.2f}",
+            ])
+        day += timedelta(days=1)
+
+    while len(grid) < 3:
+        grid.append([""] * 6)
+    for i, row in enumerate(grid[1:3], start=1):
+        row.extend([""] * (12 - len(row)))
+        if i == 1:
+            row[12:17] = [
+                end.strftime("%b %Y"), str((end - start).days + 1),
+                f"฿{usable_income:,.2f}", f"฿{total:,.2f}", f"฿{usable_income - total:,.2f}",
+            ]
+
+    os.makedirs(folder, exist_ok=True)
+    FakeWorksheet(os.path.join(folder, f"{title}.csv"), title)._write_grid(grid)
+
+
+if __name__ == "__main__":
+    folder = sys.argv[1] if len(sys.argv) > 1 else os.path.join(".cache", "fake_sheet")
+    today = date.today()
+    first = today.replace(day=1)
+    prev_first = (first - timedelta(days=1)).replace(day=1)
+    seed_fake_sheet(folder, "Month_24", prev_first, first - timedelta(days=1), seed=1)
+    seed_fake_sheet(folder, "Month_25", first, today, seed=2)
+    print(f"✅ สร้าง fake sheet ที่ {folder}")
@@ -1,12 +1,12 @@
 # home_page.py
 import streamlit as st
 import streamlit.components.v1 as components
-from datetime import datetime
+from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 import pandas as pd
-import calendar
 import plotly.graph_objects as go
 import numpy as np
+from functools import partial
 
 import pandas as pd
 import streamlit as st
@@ -14,6 +14,31 @@ import plotly.graph_objects as go
 import plotly.io as pio
 import streamlit.components.v1 as components
 
+from aggregate_store import AggregateStore, get_aggregate_store, month_key
+from analytics import DailyRollup
+from anomaly import detect_anomalies
+from client_view import build_client_payload, render_client_dashboard
+from data_loader import MAIN_COLS, get_tenant
+from data_meta import DataMeta, add_date_dt, get_data_meta
+from export import MIME_TYPES, available_formats, export_frame
+from money import parse_money, to_money
+from projection import DAILY_OFFSET, build_month_projection, projection_at
+from tenants import DEFAULT_TENANT, MAX_ACTIVE_TENANTS
+from write_queue import WriteQueue
+
+ROLLUP_DIMS = ("List", "Type_End")
+
+TREND_OVERLAYS = {
+    "Sum_7D": "7D Sum",
+    "Mean_7D": "7D Mean",
+    "Sum_14D": "14D Sum",
+    "Mean_14D": "14D Mean",
+    "Sum_30D": "30D Sum",
+    "Mean_30D": "30D Mean",
+    "MTD": "Month-to-date",
+    "List_Running": "Running total by List",
+}
+
 
 def build_type_end_summary(df: pd.DataFrame, type_col="Type_End", price_col="Price"):
     """
@@ -25,13 +50,7 @@ def build_type_end_summary(df: pd.DataFrame, type_col="Type_End", price_col="Pri
     d = df.copy()
 
     # parse price -> numeric
-    d["__price"] = (
-        d[price_col].astype(str)
-        .str.replace("฿", "", regex=False)
-        .str.replace(",", "", regex=False)
-        .str.strip()
-    )
-    d["__price"] = pd.to_numeric(d["__price"], errors="coerce")
+    d["__price"] = to_money(d[price_col])
 
     # ✅ dropna ต้องเป็น list
     d = d.dropna(subset=["__price", type_col])
@@ -220,14 +239,7 @@ def build_list_summary_table(df: pd.DataFrame):
     d = df.copy()
 
     # แปลง Price เป็นตัวเลข
-    d["Price_num"] = (
-        d["Price"]
-        .astype(str)
-        .str.replace("฿", "", regex=False)
-        .str.replace(",", "", regex=False)
-        .str.strip()
-    )
-    d["Price_num"] = pd.to_numeric(d["Price_num"], errors="coerce")
+    d["Price_num"] = to_money(d["Price"])
     d = d.dropna(subset=["Price_num"])
 
     if d.empty:
@@ -372,7 +384,19 @@ def render_summary_table_with_sticky_footer(summary_df: pd.DataFrame):
 
 
 
-def render_price_trend_chart(df: pd.DataFrame, date_col="Date", price_col="Price"):
+def render_price_trend_chart(
+    df: pd.DataFrame,
+    date_col="Date",
+    price_col="Price",
+    overlays: pd.DataFrame = None,
+    anomalies: pd.DataFrame = None,
+):
+    """
+    overlays: ตารางเส้นเสริม (index = วันที่) เช่น Mean_7D / Sum_30D / MTD / Run: <List>
+    - Mean_* อยู่แกนซ้ายร่วมกับยอดรายวัน
+    - ยอดสะสม (Sum_* / MTD / Run: *) อยู่แกนขวา
+    anomalies: จุดผิดปกติ (Date / Value / Z) ที่จะวงไว้บนเส้น Price
+    """
     if df is None or df.empty:
         st.info("ยังไม่มีข้อมูลสำหรับกราฟ")
         return
@@ -389,15 +413,8 @@ def render_price_trend_chart(df: pd.DataFrame, date_col="Date", price_col="Price
     d = d.dropna(subset=["__date"])
 
     # ----- price -----
-    # รองรับค่าแบบ: 12,345 | ฿12,345.00 | " 123 " | ฯลฯ
-    d["__price"] = (
-        d[price_col]
-        .astype(str)
-        .str.replace("฿", "", regex=False)
-        .str.replace(",", "", regex=False)
-        .str.strip()
-    )
-    d["__price"] = pd.to_numeric(d["__price"], errors="coerce")
+    # รองรับค่าแบบ: 12,345 | ฿12,345.00 | (1,234.00) | 1,234 บาท | ๑๒๓ | ฯลฯ
+    d["__price"] = to_money(d[price_col])
     d = d.dropna(subset=["__price"])
 
     if d.empty:
@@ -475,18 +492,41 @@ def render_price_trend_chart(df: pd.DataFrame, date_col="Date", price_col="Price
         annotation_position="bottom left"
     )
 
+    if anomalies is not None and not anomalies.empty:
+        fig.add_trace(go.Scatter(
+            x=anomalies["Date"], y=anomalies["Value"],
+            mode="markers",
+            name="Anomaly",
+            marker=dict(size=13, color="rgba(0,0,0,0)", line=dict(color="#ff2d2d", width=2.5)),
+            customdata=anomalies["Z"],
+            hovertemplate="%{x|%d %b %Y}<br>%{y:,.2f}<br>z = %{customdata:.1f}<extra>Anomaly</extra>",
+        ))
+
+    has_overlays = overlays is not None and not overlays.empty
+    if has_overlays:
+        for col in overlays.columns:
+            on_right = not col.startswith("Mean_")
+            fig.add_trace(go.Scatter(
+                x=overlays.index, y=overlays[col],
+                mode="lines",
+                name=col,
+                yaxis="y2" if on_right else "y",
+                line=dict(dash="dot" if on_right else "solid", width=1.5),
+            ))
+
+    y_padding = (mx - mn) * 0.05
     fig.update_layout(
         height=420,
         margin=dict(l=10, r=10, t=10, b=25),
         paper_bgcolor="rgba(0,0,0,0)",
         plot_bgcolor="rgba(0,0,0,0)",
-        showlegend=False,
-        yaxis=dict(domain=[0.12, 1.0])
+        showlegend=has_overlays,
+        legend=dict(orientation="h", y=1.08, x=0),
+        # ช่วงที่ pad แล้วใช้กับแกนหลักเท่านั้น: ยอดสะสม (y2) ใหญ่กว่ายอดรายวันมาก -> ให้ autorange
+        yaxis=dict(domain=[0.12, 1.0], range=[mn - y_padding, mx + y_padding]),
+        yaxis2=dict(domain=[0.12, 1.0], overlaying="y", side="right", showgrid=False),
     )
 
-    y_padding = (mx - mn) * 0.05
-    fig.update_yaxes(range=[mn - y_padding, mx + y_padding])
-
     fig.update_xaxes(
         type="date",
         tickformat="%d %b %Y",
@@ -499,14 +539,289 @@ def render_price_trend_chart(df: pd.DataFrame, date_col="Date", price_col="Price
 
     st.plotly_chart(fig, use_container_width=True)
 
-def parse_bath(x):
-    if x is None or (isinstance(x, float) and pd.isna(x)) or (isinstance(x, str) and x.strip() == ""):
-        return 0.0
-    s = str(x).strip().replace("฿", "").replace(",", "")
-    try:
-        return float(s)
-    except:
-        return 0.0
+def render_burn_down_chart(proj: pd.DataFrame, as_of):
+    """
+    Burn-down ทั้งเดือน: ยอดคงเหลือจริง, ยอดคาดการณ์สิ้นเดือน และงบต่อวันที่ใช้ได้
+    """
+    if proj is None or proj.empty:
+        st.info("ไม่มีข้อมูลสำหรับ Burn-down")
+        return
+
+    past = proj.iloc[:as_of.day]
+    x = proj["Date"]
+
+    fig = go.Figure()
+
+    fig.add_trace(go.Bar(
+        x=x, y=proj["Allowed_Burn"],
+        name="Allowed / Day",
+        marker_color="rgba(143,208,255,0.35)",
+        yaxis="y2",
+    ))
+
+    fig.add_trace(go.Scatter(
+        x=past["Date"], y=past["Remaining"],
+        mode="lines+markers",
+        name="Remaining",
+        line=dict(color="#2b7cff", shape="spline", smoothing=1.2),
+    ))
+
+    fig.add_trace(go.Scatter(
+        x=past["Date"], y=past["Projected_End"],
+        mode="lines",
+        name="Projected Month-End",
+        line=dict(color="#ffb6c1", dash="dash", shape="spline", smoothing=1.2),
+    ))
+
+    fig.add_hline(y=0, line_dash="dot", line_color="red")
+
+    fig.update_layout(
+        height=360,
+        margin=dict(l=10, r=10, t=10, b=25),
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        legend=dict(orientation="h", y=1.08, x=0),
+        yaxis2=dict(overlaying="y", side="right", showgrid=False),
+        barmode="overlay",
+    )
+
+    fig.update_xaxes(type="date", tickformat="%d %b", ticks="outside")
+
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def render_anomaly_table(anomalies: pd.DataFrame, limit: int = 20):
+    """
+    ตารางย่อจุดผิดปกติ (เรียงตาม z มากสุด)
+    """
+    if anomalies is None or anomalies.empty:
+        return
+
+    top = (
+        anomalies.sort_values("Z", ascending=False)
+        .head(limit)
+        .assign(Date=lambda d: d["Date"].dt.strftime("%d/%m/%Y"))
+        .round({"Value": 2, "Median": 2, "Z": 1})
+    )
+    with st.expander(f"⚠️ Anomalies ({len(anomalies)})"):
+        st.dataframe(top, hide_index=True, use_container_width=True)
+
+
+def build_period_comparison(
+    df: pd.DataFrame,
+    store: AggregateStore,
+    as_of,
+    type_end="All",
+    list_key="All",
+    channel="All",
+):
+    """
+    เดือนของ as_of (1..as_of.day, จากข้อมูลปัจจุบัน) เทียบกับเดือนก่อน (จาก aggregate store)
+    คืน (dict ตัวเลขหลัก, ตารางแยก Type_End) หรือ (None, None) ถ้า store ยังไม่มีเดือนก่อน
+    """
+    prev_month = month_key(as_of.replace(day=1) - timedelta(days=1))
+    if prev_month not in store.closed_months():
+        return None, None
+
+    filters = dict(type_end=type_end, list=list_key, channel=channel)
+
+    # ----- เดือนนี้ถึงวัน as_of (เดือนยังไม่ปิด -> คิดจาก frame) -----
+    dt = df["date_dt"]
+    mask = (dt.dt.year == as_of.year) & (dt.dt.month == as_of.month) & (dt.dt.day <= as_of.day)
+    for col, val in (("Type_End", type_end), ("List", list_key), ("Channel", channel)):
+        if col in df.columns and val != "All":
+            mask &= df[col].astype(str) == val
+    cur = df.loc[mask]
+    cur_price = to_money(cur["Price"]) if "Price" in cur.columns else pd.Series(dtype="float64")
+
+    this_mtd = float(cur_price.sum())
+    last_same_day = store.period_total(prev_month, upto_day=as_of.day, **filters)
+    last_full = store.period_total(prev_month, **filters)
+
+    by_type = pd.DataFrame({
+        "This Month": cur_price.groupby(cur["Type_End"].astype(str)).sum() if "Type_End" in cur.columns else pd.Series(dtype="float64"),
+        "Last Month (Same Day)": store.period_total(prev_month, upto_day=as_of.day, by="type_end", **filters),
+    }).fillna(0.0)
+    by_type["Change %"] = np.where(
+        by_type["Last Month (Same Day)"] > 0,
+        (by_type["This Month"] / by_type["Last Month (Same Day)"] - 1) * 100,
+        np.nan,
+    )
+    by_type = by_type.rename_axis("Type_End").reset_index().sort_values("This Month", ascending=False)
+
+    summary = {
+        "prev_month": prev_month,
+        "this_mtd": this_mtd,
+        "last_same_day": last_same_day,
+        "last_full": last_full,
+        "change_pct": (this_mtd / last_same_day - 1) * 100 if last_same_day > 0 else None,
+    }
+    return summary, by_type
+
+
+def render_period_comparison(summary: dict, by_type: pd.DataFrame, as_of):
+    if summary is None:
+        st.info("ยังไม่มีข้อมูลเดือนก่อนใน aggregate store สำหรับเปรียบเทียบ")
+        return
+
+    change = summary["change_pct"]
+    change_str = "-" if change is None else f"{change:+.2f}%"
+
+    b1, b2, b3, b4 = st.columns(4, gap="large")
+    with b1:
+        st.markdown(kpi_card(f"This Month (1-{as_of.day})", fmt_bath(summary["this_mtd"])), unsafe_allow_html=True)
+    with b2:
+        st.markdown(kpi_card(f"Last Month (1-{as_of.day})", fmt_bath(summary["last_same_day"])), unsafe_allow_html=True)
+    with b3:
+        st.markdown(kpi_card("Change vs Last Month", change_str), unsafe_allow_html=True)
+    with b4:
+        st.markdown(kpi_card(f"Last Month Total ({summary['prev_month']})", fmt_bath(summary["last_full"])), unsafe_allow_html=True)
+
+    if by_type is not None and not by_type.empty:
+        st.write("")
+        st.dataframe(
+            by_type.round(2),
+            hide_index=True,
+            use_container_width=True,
+        )
+
+
+def render_entry_form(df: pd.DataFrame, write_queue: WriteQueue, meta: DataMeta):
+    """
+    ฟอร์มเพิ่มรายการ -> write queue (เขียนชีตเป็น batch เบื้องหลัง)
+    แถวใหม่จะโผล่ในแดชบอร์ดทันทีใน rerun ถัดไป (optimistic) โดยไม่ต้องรอ cache ของ load_data
+    """
+    main_cols = df.attrs.get("main_cols") or [c for c in df.columns if c not in ("M", "N", "O", "P", "Q")]
+    if not main_cols:
+        main_cols = list(MAIN_COLS)  # ชีตยังไม่มีข้อมูลเลย: ฟอร์มนี้คือทางเพิ่มแถวแรก
+
+    def options(col):
+        return meta.options.get(col, [])
+
+    pending = [e for e in write_queue.overlay_entries(df.attrs.get("fetched_at")) if e.status == "pending"]
+    failed = write_queue.failed_entries()
+    label = "➕ เพิ่มรายการ"
+    if pending:
+        label += f" (⏳ รอบันทึก {len(pending)})"
+
+    with st.expander(label):
+        with st.form("entry_form", clear_on_submit=True):
+            values = {}
+            cols = st.columns(len(main_cols))
+            for col, name in zip(cols, main_cols):
+                with col:
+                    if name == "Date":
+                        values[name] = st.date_input(
+                            name, value=datetime.now(ZoneInfo("Asia/Bangkok")).date(), format="DD/MM/YYYY"
+                        )
+                    elif name == "Price":
+                        values[name] = st.number_input(name, min_value=0.0, step=1.0, format="%.2f")
+                    else:
+                        values[name] = st.selectbox(
+                            name, options(name), index=None, accept_new_options=True, placeholder="เลือก/พิมพ์ใหม่"
+                        )
+            submitted = st.form_submit_button("บันทึก")
+
+        if submitted:
+            if not values.get("Price"):
+                st.warning("กรุณากรอก Price")
+            else:
+                row = []
+                for name in main_cols:
+                    v = values.get(name)
+                    if name == "Date":
+                        v = v.strftime("%d/%m/%Y")
+                    elif name == "Price":
+                        v = f"{v:.2f}"
+                    row.append("" if v is None else v)
+                write_queue.submit(row)
+                st.rerun()  # ✅ วาดใหม่พร้อมแถว pending
+
+        if failed:
+            st.error(f"❌ บันทึกไม่สำเร็จ {len(failed)} รายการ: {failed[-1].error}")
+            col_retry, col_dismiss = st.columns(2)
+            with col_retry:
+                if st.button("ลองใหม่", key="retry_failed_rows"):
+                    write_queue.retry_failed()
+                    st.rerun()
+            with col_dismiss:
+                if st.button("ทิ้งรายการที่ไม่สำเร็จ", key="dismiss_failed_rows"):
+                    write_queue.dismiss_failed()
+                    st.rerun()
+
+
+@st.cache_resource(max_entries=MAX_ACTIVE_TENANTS)
+def get_daily_rollup(tenant: str = DEFAULT_TENANT) -> DailyRollup:
+    # ✅ 1 ตัวต่อ process ต่อ tenant: rerun ถัดไปจะ append เฉพาะแถวใหม่
+    # (เกิน MAX_ACTIVE_TENANTS -> tenant ที่ใช้ล่าสุดนานที่สุดถูกทิ้ง)
+    return DailyRollup(dims=ROLLUP_DIMS)
+
+
+@st.cache_data(max_entries=MAX_ACTIVE_TENANTS, show_spinner=False)
+def get_anomalies(_rollup: DailyRollup, tenant: str, data_version: str) -> pd.DataFrame:
+    # คิดใหม่เฉพาะเมื่อข้อมูลใน rollup เปลี่ยน (snapshot + overlay) ไม่ใช่ทุก rerun
+    # ใช้ data_version ไม่ใช่ rollup.version: rollup ที่ rebuild ใหม่นับ version จาก 0 ซ้ำได้
+    return detect_anomalies(_rollup, dims=ROLLUP_DIMS)
+
+
+@st.cache_data(max_entries=MAX_ACTIVE_TENANTS, show_spinner=False)
+def get_client_payload(_df: pd.DataFrame, tenant: str, version: str) -> dict:
+    # สร้าง payload ครั้งเดียวต่อ data version (snapshot + แถว pending) ไม่ใช่ทุก rerun
+    return build_client_payload(_df, date_col="date_dt")
+
+
+def build_trend_overlays(
+    rollup: DailyRollup,
+    selected: list,
+    date_from,
+    date_to,
+    list_key=None,
+) -> pd.DataFrame:
+    """
+    ตัดเส้นเสริมที่เลือกจาก rollup ให้อยู่ในช่วง date_from..date_to
+    (rolling/MTD คิดจากข้อมูลก่อนหน้า date_from ด้วย หน้าต่างแรกจึงเต็ม)
+    """
+    if not selected or rollup.start is None:
+        return None
+
+    lo, hi = pd.Timestamp(date_from), pd.Timestamp(date_to)
+    out = pd.DataFrame(index=pd.date_range(lo, hi, freq="D"))
+
+    cols = [c for c in selected if c != "List_Running"]
+    if cols:
+        ov = rollup.overlays("List", list_key) if list_key else rollup.overlays()
+        out = out.join(ov.loc[lo:hi, cols])
+
+    if "List_Running" in selected:
+        by_list = rollup.daily_by("List").loc[lo:hi]
+        if list_key:
+            by_list = by_list.loc[:, [c for c in by_list.columns if c == list_key]]
+        running = by_list.cumsum().add_prefix("Run: ")
+        out = out.join(running)
+
+    return out.dropna(axis=1, how="all")
+
+
+def render_download_buttons(df: pd.DataFrame, base_name: str, key: str):
+    """
+    ปุ่มดาวน์โหลดแยกตาม format; ไฟล์ถูกสร้าง (ทีละ chunk) ตอนกดเท่านั้น ไม่ทำใน rerun
+    """
+    if df is None or df.empty:
+        return
+
+    formats = available_formats()
+    cols = st.columns(len(formats) + 3)
+    for col, fmt in zip(cols, formats):
+        with col:
+            st.download_button(
+                f"⬇️ {fmt.upper()}",
+                data=partial(export_frame, df, fmt),
+                file_name=f"{base_name}.{fmt}",
+                mime=MIME_TYPES[fmt],
+                key=f"{key}_{fmt}",
+                on_click="ignore",
+                use_container_width=True,
+            )
 
 
 def fmt_bath(v: float):
@@ -522,7 +837,12 @@ def kpi_card(title: str, value: str):
 """
 
 
-def render_home(df: pd.DataFrame):
+def render_home(
+    df: pd.DataFrame,
+    daily_offset: float = DAILY_OFFSET,
+    write_queue: WriteQueue = None,
+    tenant: str = DEFAULT_TENANT,
+):
     # ---------------- KPI CSS (ให้เสถียรทุกครั้งที่ rerun) ----------------
 
     st.markdown("""
@@ -688,17 +1008,37 @@ def render_home(df: pd.DataFrame):
 """
     components.html(header_html, height=78)
 
-    # ---------------- เตรียมข้อมูล Date ----------------
-    df_display = df.copy()
-    df_display["date_dt"] = pd.to_datetime(df_display["Date"], dayfirst=True, errors="coerce")
-    df_display = df_display.dropna(subset=["date_dt"])
+    # ---------------- meta ของ data version (ตัวเลือก / ช่วงวันที่ / ปฏิทิน) ----------------
+    meta = get_data_meta(df)
+    df_display = add_date_dt(df)
 
-    if df_display.empty:
+    if write_queue is not None:
+        render_entry_form(df, write_queue, meta)
+
+    # ---------------- โหมด filter ฝั่ง browser ----------------
+    client_mode = st.toggle(
+        "⚡ Client-side filter",
+        key="client_mode",
+        help="ส่งยอดรวมรายวันไปครั้งเดียว แล้วเปลี่ยน filter ใน browser ได้ทันทีโดยไม่ rerun",
+    )
+    if client_mode:
+        payload = get_client_payload(df_display, tenant, meta.version)
+        if payload is None:
+            st.warning("ไม่พบข้อมูลวันที่ที่ใช้งานได้")
+            return
+        render_client_dashboard(payload)
+        st.caption("KPI จาก M-Q, Burn-down, Month over Month, Anomaly และปุ่มดาวน์โหลด ใช้ได้ในโหมดปกติ (ปิด Client-side filter)")
+        return
+
+    # ---------------- เตรียมข้อมูล Date ----------------
+    if meta.min_date is None:
         st.warning("ไม่พบข้อมูลวันที่ที่ใช้งานได้")
         return
 
-    min_date = df_display["date_dt"].min().date()
-    max_date = df_display["date_dt"].max().date()
+    if df_display["date_dt"].isna().any():
+        df_display = df_display.dropna(subset=["date_dt"])
+
+    min_date, max_date = meta.min_date, meta.max_date
 
     # ---------------- UI Filter ----------------
     col_from, col_to, col_type, col_list, col_channel = st.columns([2, 2, 1.5, 1.5, 1.5])
@@ -727,23 +1067,17 @@ def render_home(df: pd.DataFrame):
 
     with col_type:
         st.text("Type_End")
-        type_options = ["All"]
-        if "Type_End" in df_display.columns:
-            type_options += sorted(df_display["Type_End"].dropna().astype(str).unique().tolist())
+        type_options = ["All", *meta.options.get("Type_End", [])]
         selected_type = st.selectbox("type_select", type_options, index=0, label_visibility="collapsed")
 
     with col_list:
         st.text("List")
-        list_options = ["All"]
-        if "List" in df_display.columns:
-            list_options += sorted(df_display["List"].dropna().astype(str).unique().tolist())
+        list_options = ["All", *meta.options.get("List", [])]
         selected_list = st.selectbox("list_select", list_options, index=0, label_visibility="collapsed")
 
     with col_channel:
         st.text("Channel")
-        channel_options = ["All"]
-        if "Channel" in df_display.columns:
-            channel_options += sorted(df_display["Channel"].dropna().astype(str).unique().tolist())
+        channel_options = ["All", *meta.options.get("Channel", [])]
         selected_channel = st.selectbox("channel_select", channel_options, index=0, label_visibility="collapsed")
 
     if date_from > date_to:
@@ -753,8 +1087,8 @@ def render_home(df: pd.DataFrame):
     mask = (df_display["date_dt"].dt.date >= date_from) & (df_display["date_dt"].dt.date <= date_to)
     df_filtered = df_display.loc[mask].copy()
 
-    if "Type" in df_filtered.columns and selected_type != "All":
-        df_filtered = df_filtered[df_filtered["Type"].astype(str) == selected_type]
+    if "Type_End" in df_filtered.columns and selected_type != "All":
+        df_filtered = df_filtered[df_filtered["Type_End"].astype(str) == selected_type]
 
     if "List" in df_filtered.columns and selected_list != "All":
         df_filtered = df_filtered[df_filtered["List"].astype(str) == selected_list]
@@ -768,7 +1102,7 @@ def render_home(df: pd.DataFrame):
     st.write("")
 
     # ---------------- KPI 4 ใบ (อิงเดือนตาม date_to) ----------------
-    day_in_month = calendar.monthrange(date_to.year, date_to.month)[1]
+    day_in_month = meta.days_in_month(date_to)
     day_passed = date_to.day
     day_left = max(day_in_month - day_passed, 0)
     pct_passed = (day_passed / day_in_month) * 100 if day_in_month else 0.0
@@ -787,25 +1121,25 @@ def render_home(df: pd.DataFrame):
 
     # ---------------- KPI 6 ใบ (คำนวณจาก M:Q) ----------------
     mq = ["M", "N", "O", "P", "Q"]
+    projection = None
 
     if all(c in df_filtered_sorted.columns for c in mq):
         tmp = df_filtered_sorted[mq].replace("", pd.NA).dropna(how="all")
         if not tmp.empty:
             r = tmp.iloc[-1]  # ✅ แถวล่าสุดของช่วง filter
 
-            usable_income = parse_bath(r["O"])
-            expenses = parse_bath(r["P"])
-            balance = parse_bath(r["Q"])
+            # O/P/Q ทีเดียวทั้ง 3 ค่า (ค่าที่แปลงไม่ได้ = 0)
+            usable_income, expenses, balance = np.nan_to_num(parse_money(r[["O", "P", "Q"]])[0])
 
-            # ✅ Average Pay : Day = Balance / Balance Date
-            avg_pay_day = (balance / day_left) if day_left > 0 else 0.0
+            # ✅ คำนวณทั้งเดือนทีเดียว แล้ว KPI / Burn-down อ่านจากตารางเดียวกัน
+            projection = build_month_projection(
+                df_display, date_to, balance, daily_offset=daily_offset, price_col="Price"
+            )
+            today = projection_at(projection, date_to)
 
-            # ✅ Balance Use Pay : Day = Average + 172.04
-            balance_use_pay_day = avg_pay_day + 172.04
-
-            # ✅ 1 Day Forecast = Balance / (วันคงเหลือของพรุ่งนี้)
-            tomorrow_left = day_left - 1
-            one_day_forecast = (balance / tomorrow_left) if tomorrow_left > 0 else 0.0
+            avg_pay_day = today["Allowed_Burn"]               # Balance / Balance Date
+            balance_use_pay_day = today["Balance_Use_Pay_Day"]  # Average + daily_offset
+            one_day_forecast = today["One_Day_Forecast"]      # Balance / (วันคงเหลือของพรุ่งนี้)
 
             a1, a2, a3, a4, a5, a6 = st.columns(6, gap="large")
             with a1:
@@ -828,28 +1162,99 @@ def render_home(df: pd.DataFrame):
     st.write("")
 
     df_table = df_filtered.drop(columns=["date_dt"], errors="ignore")
+    pending_index = df.attrs.get("pending_index", [])
+    if pending_index:
+        df_table["Status"] = np.where(df_table.index.isin(pending_index), "⏳ pending", "")
+
+    if projection is not None:
+        st.subheader("Month Burn-down")
+        render_burn_down_chart(projection, date_to)
+        st.write("")
+
+    st.subheader("Month over Month")
+    comparison, comparison_by_type = build_period_comparison(
+        df_display,
+        get_aggregate_store(get_tenant(tenant).agg_db_path),
+        date_to,
+        type_end=selected_type,
+        list_key=selected_list,
+        channel=selected_channel,
+    )
+    render_period_comparison(comparison, comparison_by_type, date_to)
+
+    st.write("")
 
     st.subheader("Daily Price Trend")
-    render_price_trend_chart(df_filtered_sorted, date_col="Date", price_col="Price")
+    selected_overlays = st.multiselect(
+        "trend_overlays",
+        TREND_OVERLAYS,
+        default=[],
+        format_func=TREND_OVERLAYS.get,
+        placeholder="Overlays: Rolling 7/14/30D, MTD, Running total by List",
+        label_visibility="collapsed",
+    )
+
+    # rollup ตัวกลางให้คะแนน Total / List / Type_End แยกเป็นรายตัว (ไม่มี Channel และไม่มีคู่ List x Type_End)
+    # -> filter Type_End / Channel ต้องคิดจากแถวที่ filter แล้ว (เล็กกว่า raw อยู่แล้ว); filter List ใช้ตัวกลางได้
+    if selected_type == "All" and selected_channel == "All":
+        # rebuild เมื่อ snapshot เปลี่ยน, append เฉพาะแถว pending เมื่อยังเป็น snapshot เดิม
+        snapshot = df.attrs.get("meta") or {}
+        rollup = get_daily_rollup(tenant).sync(
+            df,
+            version=snapshot.get("version") or df.attrs.get("fetched_at"),
+            base_rows=snapshot.get("rows"),
+        )
+        if rollup.data_version is None:
+            anomalies = detect_anomalies(rollup, dims=ROLLUP_DIMS)
+        else:
+            anomalies = get_anomalies(rollup, tenant, rollup.data_version)
+    else:
+        rollup = DailyRollup(dims=ROLLUP_DIMS).sync(df_filtered_sorted)
+        anomalies = detect_anomalies(rollup, dims=ROLLUP_DIMS)
+
+    anomalies = anomalies[
+        (anomalies["Date"] >= pd.Timestamp(date_from)) & (anomalies["Date"] <= pd.Timestamp(date_to))
+    ]
+    if selected_list == "All":
+        flagged = anomalies[anomalies["Series"] == "Total"]
+    else:
+        flagged = anomalies[(anomalies["Series"] == "List") & (anomalies["Key"] == selected_list)]
+
+    overlays = build_trend_overlays(
+        rollup,
+        selected_overlays,
+        date_from,
+        date_to,
+        list_key=None if selected_list == "All" else selected_list,
+    )
+    render_price_trend_chart(
+        df_filtered_sorted, date_col="date_dt", price_col="Price", overlays=overlays, anomalies=flagged
+    )
+    render_anomaly_table(anomalies)
 
     st.write("")
 
+    export_tag = f"{date_from:%Y%m%d}-{date_to:%Y%m%d}"
+
     left, right = st.columns([1.05, 1.35], gap="large")
 
     with left:
         st.subheader("%Share By Type End")
         type_sum = build_type_end_summary(df_filtered_sorted, type_col="Type_End", price_col="Price")
         render_type_end_box(type_sum, title="", type_col="Type_End")   # ✅ ส่ง title="" เพื่อไม่ให้ซ้ำ
+        render_download_buttons(type_sum, f"type_end_summary_{export_tag}", key="dl_type_end")
 
     with right:
         st.subheader("Summary by List")
         summary_df = build_list_summary_table(df_filtered_sorted)
         if summary_df is not None:
             render_summary_table_with_sticky_footer(summary_df)
+            render_download_buttons(summary_df, f"list_summary_{export_tag}", key="dl_list")
         else:
             st.info("ไม่มีข้อมูลสำหรับสรุป List")
 
     st.write("")
     st.subheader(f"ข้อมูลหลัง Filter (จำนวน {len(df_table)} แถว)")
+    render_download_buttons(df_table, f"price_{export_tag}", key="dl_filtered")
     st.dataframe(df_table, use_container_width=True)
 
@@ -1,7 +1,9 @@
 # main.py
 import streamlit as st
-from data_loader import load_data
+from data_loader import get_tenants, get_write_queue, load_data
 from home_page import render_home
+from tenants import ACCESS_PARAM, TENANT_PARAM, can_access, resolve_tenant
+from write_queue import apply_pending
 import plotly.graph_objects as go
 
 def main():
@@ -11,14 +13,29 @@ def main():
         layout="wide",
     )
 
+    # ?tenant=<id> เลือกชีต (ไม่ระบุ = ชีตเดิม)
+    try:
+        config = resolve_tenant(get_tenants(), st.query_params.get(TENANT_PARAM))
+    except KeyError as e:
+        st.error(f"❌ {e.args[0]}")
+        return
+
+    # ✅ เช็กสิทธิ์ก่อนอ่าน / เขียนชีตของ tenant (?key=<token> หรือ login แล้ว email อยู่ใน allowed_users)
+    user_email = st.user.get("email") if st.user.get("is_logged_in") else None
+    if not can_access(config, st.query_params.get(ACCESS_PARAM), user_email):
+        st.error("🔒 ไม่มีสิทธิ์เปิดข้อมูลชุดนี้")
+        return
+    tenant = config.id
+
     try:
         # 🔄 Spinner ตอนโหลดข้อมูลจริง (เห็นแน่นอน)
         with st.spinner("⏳ Loading data from Google Sheet..."):
-            df = load_data()
+            write_queue = get_write_queue(tenant)
+            df = apply_pending(load_data(tenant), write_queue)
 
         # 🔄 Spinner ตอนเตรียม Dashboard
         with st.spinner("⚙️ Preparing dashboard..."):
-            render_home(df)
+            render_home(df, daily_offset=config.daily_offset, write_queue=write_queue, tenant=tenant)
 
     except Exception as e:
         st.error("❌ มีปัญหาในการโหลดข้อมูล")
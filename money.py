@@ -0,0 +1,126 @@
+# money.py
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from cachetools import LRUCache
+
+# ---------------- CONFIG ----------------
+# ตัดทิ้งก่อนแปลงเป็นตัวเลข: สัญลักษณ์/หน่วยเงิน, comma, zero-width (regex แบบ RE2 ของ pyarrow)
+_STRIP_PATTERN = r"฿|บาท|THB|,|[\x{200b}\x{feff}]"
+# เว้นวรรคคั่นหลักพัน ("1 234 567", NBSP / thin space ก็ได้) -> ต่อกัน; เว้นวรรคแบบอื่นกลางตัวเลขถือว่าไม่ใช่ตัวเลข
+_GROUP_SPACE_PATTERN = r"(\d)[ \x{a0}\x{2009}\x{202f}](\d{3})\b"
+_EDGE_SPACE_PATTERN = r"^[\s\p{Z}]+|[\s\p{Z}]+$"
+# วงเล็บ = ติดลบแบบบัญชี จึงห้ามมีเครื่องหมายซ้อนข้างใน ("(-5)" ไม่ใช่ตัวเลข)
+_NUMBER_PATTERN = r"^(\((\d+\.?\d*|\.\d+)\)|[-+]?(\d+\.?\d*|\.\d+))$"
+
+# ตัวเลขไทย ๐-๙ -> 0-9
+_THAI_DIGITS = "๐๑๒๓๔๕๖๗๘๙"
+
+# cache ผล parse ของ string ที่เจอบ่อย (ข้าม rerun / ข้ามคอลัมน์)
+_CACHE_SIZE = 65_536
+_cache = LRUCache(maxsize=_CACHE_SIZE)
+_cache_lock = threading.Lock()
+
+
+def _parse_unique(texts) -> np.ndarray:
+    """
+    แปลง string ที่ไม่ซ้ำกันเป็น float (NaN = แปลงไม่ได้) แบบ vectorized
+    """
+    s = pa.array(texts, type=pa.string())
+
+    for i, digit in enumerate(_THAI_DIGITS):
+        s = pc.replace_substring(s, digit, str(i))
+    s = pc.replace_substring_regex(s, _STRIP_PATTERN, "")
+    # match ไม่ซ้อนกัน -> "1 234 567" ต้องวน 2 รอบ
+    while pc.any(pc.match_substring_regex(s, _GROUP_SPACE_PATTERN)).as_py():
+        s = pc.replace_substring_regex(s, _GROUP_SPACE_PATTERN, r"\1\2")
+    s = pc.replace_substring_regex(s, _EDGE_SPACE_PATTERN, "")
+
+    # ติดลบแบบบัญชี "(1,234.00)" และ "-฿1,234"
+    valid = pc.match_substring_regex(s, _NUMBER_PATTERN)
+    negative = pc.starts_with(s, "(")
+    s = pc.utf8_trim(pc.if_else(valid, s, None), "()")
+
+    values = pc.cast(s, pa.float64()).to_numpy(zero_copy_only=False)
+    return np.where(negative.to_numpy(zero_copy_only=False), -values, values)
+
+
+def parse_money(values) -> tuple[np.ndarray, np.ndarray]:
+    """
+    แปลงคอลัมน์เงินบาททั้งคอลัมน์ -> (ค่า float64, mask ว่าแปลงได้)
+
+    รองรับ: 12,345 | ฿12,345.00 | (1,234.00) | 1,234 บาท | ๑,๒๓๔ | " 123 " | 1 234 567
+    ค่าที่แปลงไม่ได้/ว่างจะเป็น NaN และ mask = False
+    """
+    s = values if isinstance(values, pd.Series) else pd.Series(values)
+
+    if s.empty:
+        return np.empty(0, dtype="float64"), np.empty(0, dtype=bool)
+
+    # ✅ คอลัมน์ตัวเลขอยู่แล้ว ไม่ต้อง parse string
+    if pd.api.types.is_numeric_dtype(s.dtype) and not pd.api.types.is_bool_dtype(s.dtype):
+        out = s.to_numpy(dtype="float64", na_value=np.nan)
+        return out, ~np.isnan(out)
+
+    # ✅ object ที่มีตัวเลข Python ปน (UNFORMATTED_VALUE ของ Sheets API) -> ใช้ตัวเลขตรงๆ parse เฉพาะ string
+    # (str(1e-05) เป็น scientific notation ซึ่ง parser ของ string ไม่รับ)
+    if s.dtype == object:
+        raw = s.to_numpy()
+        is_num = np.fromiter(
+            (isinstance(v, (int, float, np.number)) and not isinstance(v, (bool, np.bool_)) for v in raw),
+            dtype=bool,
+            count=len(raw),
+        )
+        if is_num.any():
+            out = np.full(len(raw), np.nan)
+            out[is_num] = raw[is_num].astype("float64")
+            if not is_num.all():
+                out[~is_num], _ = parse_money(pd.Series(raw[~is_num], dtype="object"))
+            return out, ~np.isnan(out)
+
+    # parse เฉพาะค่าไม่ซ้ำ แล้วกระจายกลับด้วย codes
+    codes, uniques = pd.factorize(s, use_na_sentinel=True)
+    keys = pd.Index(uniques, dtype="object").astype(str)
+
+    # ค่าไม่ซ้ำเยอะเกิน cache -> parse ตรงๆ (cache ช่วยเฉพาะค่าที่ซ้ำ)
+    if len(keys) > _CACHE_SIZE:
+        return _take(_parse_unique(keys), codes)
+
+    keys = keys.tolist()
+    parsed = np.full(len(keys), np.nan)
+    missing = []
+    with _cache_lock:
+        for i, k in enumerate(keys):
+            hit = _cache.get(k)
+            if hit is None:
+                missing.append(i)
+            else:
+                parsed[i] = hit
+
+    if missing:
+        fresh = _parse_unique([keys[i] for i in missing])
+        parsed[missing] = fresh
+        with _cache_lock:
+            for i, v in zip(missing, fresh):
+                _cache[keys[i]] = v
+
+    return _take(parsed, codes)
+
+
+def _take(parsed: np.ndarray, codes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    out = np.full(len(codes), np.nan)
+    hit_rows = codes >= 0
+    out[hit_rows] = parsed[codes[hit_rows]]
+    return out, ~np.isnan(out)
+
+
+def to_money(values) -> pd.Series:
+    """
+    เหมือน parse_money แต่คืน Series (index เดิม) ค่าที่แปลงไม่ได้เป็น NaN
+    """
+    out, _ = parse_money(values)
+    index = values.index if isinstance(values, pd.Series) else None
+    return pd.Series(out, index=index, dtype="float64")
@@ -0,0 +1,82 @@
+# projection.py
+import calendar
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from money import to_money
+
+# ---------------- CONFIG ----------------
+# ค่าที่บวกเพิ่มจาก Average Pay : Day -> Balance Use Pay : Day
+DAILY_OFFSET = 172.04
+
+PROJECTION_COLS = [
+    "Date",
+    "Spend",
+    "Cum_Spend",
+    "Remaining",
+    "Days_Left",
+    "Allowed_Burn",
+    "Balance_Use_Pay_Day",
+    "One_Day_Forecast",
+    "Projected_End",
+]
+
+
+def build_month_projection(
+    df: pd.DataFrame,
+    as_of: date,
+    balance: float,
+    daily_offset: float = DAILY_OFFSET,
+    date_col="date_dt",
+    price_col="Price",
+) -> pd.DataFrame:
+    """
+    คำนวณงบทั้งเดือนของ as_of ทีเดียว (1 แถว = 1 วัน)
+
+    - Remaining      : ยอดคงเหลือสิ้นวัน (ยึด balance จาก Q ณ วัน as_of)
+    - Allowed_Burn   : Remaining / วันที่เหลือ  (= Average Pay : Day)
+    - Balance_Use_Pay_Day / One_Day_Forecast : ตาม KPI เดิม
+    - Projected_End  : ยอดคาดการณ์สิ้นเดือน ถ้าใช้เงินตามค่าเฉลี่ยจนถึงวันนั้น
+    """
+    days_in_month = calendar.monthrange(as_of.year, as_of.month)[1]
+    day = np.arange(1, days_in_month + 1)
+
+    # ----- spend รายวันของเดือนนี้ -----
+    spend = np.zeros(days_in_month)
+    if df is not None and not df.empty and date_col in df.columns and price_col in df.columns:
+        dt = pd.to_datetime(df[date_col], errors="coerce")
+        in_month = (dt.dt.year == as_of.year) & (dt.dt.month == as_of.month)
+        price = to_money(df.loc[in_month, price_col]).fillna(0.0).to_numpy()
+        np.add.at(spend, dt[in_month].dt.day.to_numpy() - 1, price)
+
+    cum_spend = np.cumsum(spend)
+
+    # ยอดคงเหลือย้อนหลัง/ล่วงหน้าจาก balance ณ as_of
+    remaining = balance + cum_spend[as_of.day - 1] - cum_spend
+    days_left = days_in_month - day
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        allowed_burn = np.where(days_left > 0, remaining / days_left, 0.0)
+        one_day_forecast = np.where(days_left - 1 > 0, remaining / (days_left - 1), 0.0)
+        run_rate = cum_spend / day
+
+    return pd.DataFrame({
+        "Date": pd.date_range(date(as_of.year, as_of.month, 1), periods=days_in_month, freq="D"),
+        "Spend": spend,
+        "Cum_Spend": cum_spend,
+        "Remaining": remaining,
+        "Days_Left": days_left,
+        "Allowed_Burn": allowed_burn,
+        "Balance_Use_Pay_Day": allowed_burn + daily_offset,
+        "One_Day_Forecast": one_day_forecast,
+        "Projected_End": remaining - run_rate * days_left,
+    }, columns=PROJECTION_COLS)
+
+
+def projection_at(proj: pd.DataFrame, as_of: date) -> pd.Series:
+    """
+    แถวของวัน as_of (ใช้กับ KPI cards)
+    """
+    return proj.iloc[as_of.day - 1]
@@ -0,0 +1,208 @@
+# shared_cache.py
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+import pyarrow as pa
+
+try:
+    import fcntl
+except ImportError:  # Windows: ไม่มี flock -> ทุก process refresh เอง
+    fcntl = None
+
+# ---------------- CONFIG ----------------
+SHARED_CACHE_DIR = os.environ.get("PRICE_SHARED_CACHE_DIR", os.path.join(".cache", "shared"))
+SHARED_CACHE_TTL = 300       # วินาที (เท่ากับ TTL เดิมของ load_data)
+KEEP_SNAPSHOTS = 3           # ไฟล์เก่าที่เก็บไว้ เผื่อ process อื่นยัง map อยู่
+RETRY_BACKOFF = 60           # วินาที: refresh ล้มเหลว -> ใช้ snapshot เก่าไปก่อน ไม่ fetch ซ้ำทุก rerun
+
+_ATTRS_KEY = b"price_attrs"
+
+
+class SharedSnapshotCache:
+    """
+    cache ข้าม process สำหรับ frame ของ load_data (หลาย Streamlit worker บนเครื่องเดียว)
+
+    - snapshot = ไฟล์ Arrow IPC ที่เขียนครั้งเดียวแล้วไม่แก้ (immutable)
+    - CURRENT  = ไฟล์ json ชี้ snapshot ล่าสุด (เปลี่ยนด้วย os.replace -> atomic)
+    - refresh.lock = flock; worker ที่ได้ lock เป็นคน fetch ชีต คนอื่นใช้ snapshot เดิมไปก่อน
+    - refresh.failed = mtime คือเวลาที่ fetch ล้มเหลวล่าสุด (ทุก worker รอ RETRY_BACKOFF ก่อนลองใหม่)
+    - ทุก worker memory-map ไฟล์เดียวกัน -> ข้อมูลอยู่ใน page cache ชุดเดียว
+    """
+
+    def __init__(self, folder: str = SHARED_CACHE_DIR, ttl: float = SHARED_CACHE_TTL):
+        self.folder = folder
+        self.ttl = ttl
+        os.makedirs(folder, exist_ok=True)
+        self._current_path = os.path.join(folder, "CURRENT")
+        self._lock_path = os.path.join(folder, "refresh.lock")
+        self._failed_path = os.path.join(folder, "refresh.failed")
+        self._mutex = threading.Lock()     # กัน thread ใน process เดียวกัน fetch ซ้ำ
+        self._loaded = (None, None)        # (ชื่อไฟล์, DataFrame) ที่ map ไว้แล้ว
+        self.resident_bytes = 0            # ขนาดโดยประมาณของ frame ที่ถืออยู่ (ใช้คุม memory หลาย tenant)
+
+    # ---------------- pointer ----------------
+    def _read_current(self):
+        try:
+            with open(self._current_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if not os.path.exists(os.path.join(self.folder, meta.get("file", ""))):
+            return None
+        return meta
+
+    def _is_fresh(self, meta) -> bool:
+        return meta is not None and time.time() - meta["fetched_at"] < self.ttl
+
+    # ---------------- backoff ----------------
+    def _failed_recently(self) -> bool:
+        try:
+            return time.time() - os.path.getmtime(self._failed_path) < RETRY_BACKOFF
+        except OSError:
+            return False
+
+    def _mark_failed(self):
+        with open(self._failed_path, "w", encoding="utf-8"):
+            pass  # แค่ touch: mtime = เวลาที่ล้มเหลว
+
+    def _clear_failed(self):
+        try:
+            os.remove(self._failed_path)
+        except FileNotFoundError:
+            pass
+
+    # ---------------- read ----------------
+    def _load(self, meta) -> pd.DataFrame:
+        name = meta["file"]
+        if self._loaded[0] == name:
+            return self._loaded[1]
+
+        # zero-copy: Arrow buffer ชี้เข้า mmap โดยตรง (string column ของ pandas 3 ก็ใช้ buffer เดิม)
+        # split_blocks: คอลัมน์ตัวเลข/วันที่ไม่ถูกรวมเป็น block ใหม่ -> ไม่ copy ออกจาก mmap
+        source = pa.memory_map(os.path.join(self.folder, name), "r")
+        table = pa.ipc.open_file(source).read_all()
+        df = table.to_pandas(split_blocks=True)
+
+        raw = (table.schema.metadata or {}).get(_ATTRS_KEY)
+        if raw:
+            df.attrs.update(json.loads(raw))
+
+        self._loaded = (name, df)
+        self.resident_bytes = int(df.memory_usage(deep=True).sum())
+        return df
+
+    def release(self):
+        """
+        ปล่อย frame ที่ถือไว้ (snapshot บนดิสก์ยังอยู่ -> เรียก get() ครั้งหน้าจะ map ใหม่)
+        """
+        with self._mutex:
+            self._loaded = (None, None)
+            self.resident_bytes = 0
+
+    # ---------------- write ----------------
+    def _write(self, df: pd.DataFrame, fetched_at: float):
+        name = f"snapshot-{time.time_ns()}-{os.getpid()}.arrow"
+        path = os.path.join(self.folder, name)
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        attrs = {k: v for k, v in df.attrs.items() if _is_json(v)}
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            _ATTRS_KEY: json.dumps(attrs).encode("utf-8"),
+        })
+
+        tmp = f"{path}.tmp"
+        with pa.OSFile(tmp, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp, path)
+
+        pointer_tmp = f"{self._current_path}.{os.getpid()}.tmp"
+        with open(pointer_tmp, "w", encoding="utf-8") as f:
+            json.dump({"file": name, "fetched_at": fetched_at, "rows": len(df)}, f)
+        os.replace(pointer_tmp, self._current_path)
+
+        self._cleanup(keep=name)
+
+    def _cleanup(self, keep: str):
+        # ลบ snapshot เก่า (Linux: process ที่ยัง map ไฟล์อยู่อ่านต่อได้แม้ไฟล์ถูก unlink)
+        files = sorted(f for f in os.listdir(self.folder) if f.startswith("snapshot-") and f.endswith(".arrow"))
+        for f in files[:-KEEP_SNAPSHOTS]:
+            if f != keep:
+                try:
+                    os.remove(os.path.join(self.folder, f))
+                except OSError:
+                    pass
+
+    # ---------------- leadership ----------------
+    def _try_lock(self, blocking: bool):
+        handle = open(self._lock_path, "a+")
+        if fcntl is None:
+            return handle
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            handle.close()
+            return None
+        return handle
+
+    @staticmethod
+    def _unlock(handle):
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+        handle.close()
+
+    def get(self, fetch) -> pd.DataFrame:
+        """
+        คืน frame ล่าสุด; ถ้าหมดอายุ worker เดียวจะเรียก fetch() แล้วเขียน snapshot ใหม่
+        """
+        meta = self._read_current()
+        if self._is_fresh(meta):
+            return self._load(meta)
+        if meta is not None and self._failed_recently():
+            return self._load(meta)
+
+        # มี snapshot เก่าอยู่แล้ว -> ไม่รอทั้ง thread อื่นและ process อื่นที่กำลัง fetch; ยังไม่มีเลย -> รอ
+        if not self._mutex.acquire(blocking=meta is None):
+            return self._load(meta)
+        try:
+            meta = self._read_current()
+            if self._is_fresh(meta):
+                return self._load(meta)
+
+            handle = self._try_lock(blocking=meta is None)
+            if handle is None:
+                return self._load(meta)
+
+            try:
+                meta = self._read_current()
+                if self._is_fresh(meta) or (meta is not None and self._failed_recently()):
+                    return self._load(meta)
+
+                fetched_at = time.time()
+                try:
+                    df = fetch()
+                except Exception:
+                    self._mark_failed()
+                    if meta is not None:
+                        return self._load(meta)  # ใช้ของเก่าไปก่อน พ้น RETRY_BACKOFF ค่อยลองใหม่
+                    raise
+                self._write(df, fetched_at)
+                self._clear_failed()
+            finally:
+                self._unlock(handle)
+        finally:
+            self._mutex.release()
+
+        return self._load(self._read_current())
+
+
+def _is_json(v) -> bool:
+    try:
+        json.dumps(v)
+    except (TypeError, ValueError):
+        return False
+    return True
@@ -0,0 +1,232 @@
+# tenants.py
+# หลายชีต (หลายบ้าน / หลายทีม) ใน deployment เดียว: เลือกด้วย ?tenant=<id>
+#
+# .streamlit/secrets.toml
+#   daily_offset = 172.04                  # บาท/วัน ที่บวกในยอดคาดการณ์ ของ tenant default และ tenant ที่ไม่ได้ตั้งเอง
+#
+#   [tenants.home]
+#   label = "บ้าน"
+#   sheet_id = "..."
+#   sheet_name = "Month_25"
+#   credentials = "gcp_service_account"   # ชื่อ section ของ service account (tenant ที่ใช้ร่วมกันได้ client เดียว)
+#   ttl = 300
+#   token = "..."                          # เปิดด้วย ?tenant=home&key=<token>
+#   allowed_users = ["me@example.com"]     # หรือ login ด้วย st.login แล้ว email อยู่ในรายการนี้
+#   # public = true                        # เปิดได้ทุกคน (ไม่ตั้ง token / allowed_users / public -> ไม่มีใครเปิดได้)
+#   daily_offset = 150                     # แยกต่อ tenant (ไม่ตั้ง -> ค่าบนสุด หรือ DAILY_OFFSET)
+import hmac
+import os
+import threading
+import time
+from dataclasses import dataclass, field, replace
+
+from cachetools import LRUCache
+
+from aggregate_store import AGG_DB_PATH
+from projection import DAILY_OFFSET
+from shared_cache import SHARED_CACHE_DIR, SHARED_CACHE_TTL, SharedSnapshotCache
+
+# ---------------- CONFIG ----------------
+DEFAULT_TENANT = "default"
+TENANT_PARAM = "tenant"                          # query param
+ACCESS_PARAM = "key"                             # query param: token ของ tenant
+TENANT_CACHE_ROOT = os.path.join(".cache", "tenants")
+
+MAX_CLIENTS = 8                    # gspread client (1 ตัว = 1 HTTP session) ที่เปิดค้างไว้
+MAX_ACTIVE_TENANTS = 8             # tenant ที่ถือ frame ไว้ในหน่วยความจำพร้อมกัน
+TENANT_IDLE_TTL = 30 * 60          # วินาที: ไม่มีใครเปิดนานเกินนี้ -> ปล่อย frame
+TENANT_MEMORY_BUDGET = 512 * 1024 ** 2   # byte รวมของ frame ทุก tenant ใน process
+
+
+@dataclass(frozen=True)
+class TenantConfig:
+    id: str
+    sheet_id: str
+    sheet_name: str
+    credentials: str = "gcp_service_account"
+    label: str = ""
+    ttl: float = SHARED_CACHE_TTL
+    token: str = field(default="", repr=False)
+    allowed_users: tuple = ()                    # email (ตัวเล็ก) ของ st.user
+    public: bool = False
+    daily_offset: float = DAILY_OFFSET           # บาท/วัน ที่บวกในยอดคาดการณ์ของเดือน
+
+    @property
+    def cache_dir(self) -> str:
+        # tenant เดิม (default) ใช้ path เดิม -> snapshot / aggregate ที่มีอยู่ไม่หาย
+        if self.id == DEFAULT_TENANT:
+            return SHARED_CACHE_DIR
+        return os.path.join(TENANT_CACHE_ROOT, self.id, "shared")
+
+    @property
+    def agg_db_path(self) -> str:
+        if self.id == DEFAULT_TENANT:
+            return AGG_DB_PATH
+        return os.path.join(TENANT_CACHE_ROOT, self.id, "aggregates.sqlite")
+
+
+def load_tenants(secrets, default: TenantConfig) -> dict:
+    """
+    อ่าน [tenants.<id>] จาก st.secrets; ไม่มี section นี้ -> มีแค่ default (ชีตเดิม)
+    """
+    try:
+        section = secrets.get("tenants") or {}
+        offset = secrets.get("daily_offset")
+    except FileNotFoundError:  # ยังไม่มี secrets.toml (เช่นรันกับ fake sheet)
+        section, offset = {}, None
+    if offset is not None:
+        default = replace(default, daily_offset=float(offset))
+
+    tenants = {}
+    for tid, cfg in section.items():
+        tenants[tid] = TenantConfig(
+            id=tid,
+            sheet_id=cfg["sheet_id"],
+            sheet_name=cfg.get("sheet_name", default.sheet_name),
+            credentials=cfg.get("credentials", default.credentials),
+            label=cfg.get("label", tid),
+            ttl=float(cfg.get("ttl", default.ttl)),
+            token=str(cfg.get("token", "")),
+            allowed_users=tuple(str(u).strip().lower() for u in cfg.get("allowed_users", [])),
+            public=bool(cfg.get("public", False)),
+            daily_offset=float(cfg.get("daily_offset", default.daily_offset)),
+        )
+    return tenants or {default.id: default}
+
+
+def resolve_tenant(tenants: dict, requested: str = None) -> TenantConfig:
+    """
+    tenant จาก query param; ไม่ระบุ -> default (หรือ tenant แรกใน secrets)
+    """
+    if requested:
+        if requested not in tenants:
+            raise KeyError(f"ไม่พบ tenant '{requested}'")
+        return tenants[requested]
+    return tenants.get(DEFAULT_TENANT) or next(iter(tenants.values()))
+
+
+def can_access(tenant: TenantConfig, token: str = None, user_email: str = None) -> bool:
+    """
+    session นี้อ่าน / เขียนชีตของ tenant ได้ไหม: public, token ตรงกับ ?key=, หรือ email ของ st.user อยู่ใน allowed_users
+    tenant ที่ไม่ได้ตั้งอะไรเลยถือว่าปิด (เดา id ได้ก็ไม่เห็นข้อมูลบ้านอื่น)
+    """
+    if tenant.public:
+        return True
+    if tenant.token and token and hmac.compare_digest(str(token).encode(), tenant.token.encode()):
+        return True
+    return bool(user_email) and user_email.strip().lower() in tenant.allowed_users
+
+
+# ---------------- CLIENT POOL ----------------
+class _ClosingLRU(LRUCache):
+    # client ที่หลุดจาก pool -> ปิด HTTP session ด้วย แล้วแจ้ง on_evict(credentials)
+    def __init__(self, maxsize: int, on_evict=None):
+        super().__init__(maxsize=maxsize)
+        self._on_evict = on_evict
+
+    def popitem(self):
+        key, client = super().popitem()
+        session = getattr(getattr(client, "http_client", None), "session", None)
+        if session is not None:
+            session.close()
+        if self._on_evict is not None:
+            self._on_evict(key)
+        return key, client
+
+
+class ClientPool:
+    """
+    gspread client ต่อ service account (ไม่ใช่ต่อ tenant) -> tenant ที่ใช้ account เดียวกัน
+    ใช้ token / HTTP session ร่วมกัน; Spreadsheet ที่ open_by_key แล้วก็ถูกเก็บไว้ไม่เปิดซ้ำ
+    """
+
+    def __init__(self, factory, max_clients: int = MAX_CLIENTS):
+        self._factory = factory                # credentials (ชื่อ section) -> client
+        self._clients = _ClosingLRU(maxsize=max_clients, on_evict=self._drop_books)
+        self._books = LRUCache(maxsize=max_clients * 4)
+        self._lock = threading.Lock()
+
+    def _drop_books(self, credentials: str):
+        # Spreadsheet ผูกกับ client (session) ที่เพิ่งถูกปิด -> ทิ้งด้วย (ถูกเรียกตอนถือ _lock อยู่แล้ว)
+        for key in [k for k in self._books if k[0] == credentials]:
+            del self._books[key]
+
+    def client(self, tenant: TenantConfig):
+        with self._lock:
+            client = self._clients.get(tenant.credentials)
+            if client is None:
+                client = self._factory(tenant)
+                self._clients[tenant.credentials] = client
+            return client
+
+    def spreadsheet(self, tenant: TenantConfig):
+        key = (tenant.credentials, tenant.sheet_id)
+        with self._lock:
+            book = self._books.get(key)
+        if book is None:
+            client = self.client(tenant)
+            book = client.open_by_key(tenant.sheet_id)
+            with self._lock:
+                # client อาจถูกเบียดออกระหว่าง open_by_key -> ไม่เก็บ book ที่ผูกกับ session ที่ปิดแล้ว
+                if self._clients.get(tenant.credentials) is client:
+                    self._books[key] = book
+        return book
+
+
+# ---------------- PER-TENANT CACHE ----------------
+class TenantCacheRegistry:
+    """
+    SharedSnapshotCache แยก folder / TTL / refresh lock ต่อ tenant
+
+    snapshot บนดิสก์อยู่ต่อเสมอ แต่ frame ที่ map ไว้ใน process จะถูกปล่อยเมื่อ
+    - tenant ไม่ถูกเปิดเกิน idle_ttl
+    - มี tenant ที่ถือ frame เกิน max_active หรือขนาดรวมเกิน memory_budget (ปล่อยตัวที่ใช้ล่าสุดนานที่สุดก่อน)
+    """
+
+    def __init__(
+        self,
+        max_active: int = MAX_ACTIVE_TENANTS,
+        idle_ttl: float = TENANT_IDLE_TTL,
+        memory_budget: int = TENANT_MEMORY_BUDGET,
+    ):
+        self.max_active = max_active
+        self.idle_ttl = idle_ttl
+        self.memory_budget = memory_budget
+        self._caches = {}        # tenant id -> SharedSnapshotCache
+        self._last_used = {}     # tenant id -> time.time()
+        self._lock = threading.Lock()
+
+    def get(self, tenant: TenantConfig) -> SharedSnapshotCache:
+        with self._lock:
+            cache = self._caches.get(tenant.id)
+            if cache is None:
+                cache = SharedSnapshotCache(tenant.cache_dir, ttl=tenant.ttl)
+                self._caches[tenant.id] = cache
+            self._last_used[tenant.id] = time.time()
+            self._evict(keep=tenant.id)
+            return cache
+
+    def _evict(self, keep: str):
+        now = time.time()
+        resident = [
+            tid for tid in sorted(self._last_used, key=self._last_used.get)
+            if tid != keep and self._caches[tid].resident_bytes
+        ]
+
+        for tid in list(resident):
+            if now - self._last_used[tid] > self.idle_ttl:
+                self._caches[tid].release()
+                resident.remove(tid)
+
+        total = sum(c.resident_bytes for c in self._caches.values())
+        while resident and (len(resident) + 1 > self.max_active or total > self.memory_budget):
+            tid = resident.pop(0)
+            total -= self._caches[tid].resident_bytes
+            self._caches[tid].release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                tid: {"resident_bytes": c.resident_bytes, "idle_s": time.time() - self._last_used[tid]}
+                for tid, c in self._caches.items()
+            }
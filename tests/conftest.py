@@ -0,0 +1,6 @@
+# tests/conftest.py
+# โมดูลของแอปอยู่ที่ root (ไม่ใช่ package) -> ให้ import ได้ไม่ว่ารัน pytest จากที่ไหน
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,83 @@
+import sqlite3
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from aggregate_store import AggregateStore, aggregate_frame
+
+TODAY = date(2026, 10, 5)
+
+
+def frame(*rows):
+    return pd.DataFrame(rows, columns=["Date", "Type_End", "List", "Channel", "Price"])
+
+
+@pytest.fixture
+def store(tmp_path):
+    return AggregateStore(str(tmp_path / "agg.sqlite"))
+
+
+def test_aggregate_frame_groups_by_day_and_dims():
+    agg = aggregate_frame(frame(
+        ("01/09/2026", "Need", "Food", "Cash", "10"),
+        ("01/09/2026", "Need", "Food", "Cash", "฿5.50"),
+        ("bad", "Need", "Food", "Cash", "1"),
+        ("02/09/2026", "Want", "Taxi", "Card", ""),
+    ))
+    assert agg[["day", "total", "n"]].values.tolist() == [["2026-09-01", 15.5, 2]]
+
+
+@pytest.mark.parametrize("order", [("Month_24", "Month_25"), ("Month_25", "Month_24")])
+def test_month_spanning_two_sheets_sums_both(store, order):
+    sheets = {
+        "Month_24": frame(("30/08/2026", "Need", "Food", "Cash", "30")),
+        "Month_25": frame(
+            ("31/08/2026", "Need", "Food", "Cash", "300"),
+            ("01/09/2026", "Need", "Food", "Cash", "7"),
+        ),
+    }
+    for name in order:
+        store.close_finished_months(sheets[name], source=name, today=TODAY)
+
+    assert store.closed_months() == {"2026-08", "2026-09"}
+    assert store.period_total("2026-08") == 330.0
+    assert store.period_total("2026-08", upto_day=30) == 30.0
+    assert store.period_total("2026-08", by="list").to_dict() == {"Food": 330.0}
+
+
+def test_close_is_once_per_source(store):
+    store.close_finished_months(frame(("01/09/2026", "Need", "Food", "Cash", "10")), "Month_25", today=TODAY)
+    again = store.close_finished_months(frame(("01/09/2026", "Need", "Food", "Cash", "99")), "Month_25", today=TODAY)
+    assert again == []
+    assert store.period_total("2026-09") == 10.0
+    assert store.closed_months(source="Month_24") == set()
+
+
+def test_current_month_stays_open(store):
+    closed = store.close_finished_months(
+        frame(("01/10/2026", "Need", "Food", "Cash", "1"), ("30/09/2026", "Need", "Food", "Cash", "2")),
+        "Month_25",
+        today=TODAY,
+    )
+    assert closed == ["2026-09"]
+    assert store.period_total("2026-10") == 0.0
+
+
+def test_old_schema_is_rebuilt(tmp_path):
+    path = str(tmp_path / "agg.sqlite")
+    with sqlite3.connect(path) as con:
+        con.executescript(
+            "CREATE TABLE daily_agg (month TEXT, day TEXT, type_end TEXT, list TEXT, channel TEXT, total REAL, n INTEGER);"
+            "INSERT INTO daily_agg VALUES ('2026-08', '2026-08-30', 'Need', 'Food', 'Cash', 30, 1);"
+            "CREATE TABLE closed_months (month TEXT PRIMARY KEY, source TEXT, rows INTEGER, closed_at TEXT);"
+            "INSERT INTO closed_months VALUES ('2026-08', 'Month_24', 1, '');"
+            "CREATE TABLE loaded_sheets (sheet TEXT PRIMARY KEY, loaded_at TEXT);"
+            "INSERT INTO loaded_sheets VALUES ('Month_24', '');"
+        )
+    con.close()
+
+    store = AggregateStore(path)
+    assert store.closed_months() == set() and store.loaded_sheets() == set()
+    store.close_finished_months(frame(("31/08/2026", "Need", "Food", "Cash", "300")), "Month_25", today=TODAY)
+    assert AggregateStore(path).period_total("2026-08") == 300.0
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from analytics import DailyRollup, build_overlays
+
+
+def frame(rows):
+    return pd.DataFrame(rows, columns=["Date", "List", "Price"])
+
+
+BASE = [
+    ("01/09/2026", "Food", "10"),
+    ("02/09/2026", "Taxi", "20"),
+    ("03/09/2026", "Food", "30"),
+]
+
+
+def test_new_snapshot_rebuilds_after_edit_of_earlier_row():
+    rollup = DailyRollup(dims=("List",)).sync(frame(BASE), version="v1", base_rows=3)
+    assert rollup.daily().tolist() == [10, 20, 30]
+
+    edited = [("01/09/2026", "Food", "999")] + BASE[1:]
+    rollup.sync(frame(edited), version="v2", base_rows=3)
+    assert rollup.daily().tolist() == [999, 20, 30]
+    assert rollup.daily("List", "Food").tolist() == [999, 0, 30]
+
+
+def test_new_snapshot_rebuilds_after_middle_row_deleted():
+    rollup = DailyRollup(dims=("List",)).sync(frame(BASE), version="v1", base_rows=3)
+    rollup.sync(frame([BASE[0], BASE[2]]), version="v2", base_rows=2)
+    assert rollup.daily().tolist() == [10, 0, 30]
+
+
+def test_same_snapshot_appends_only_new_overlay_rows():
+    rollup = DailyRollup(dims=("List",)).sync(frame(BASE), version="v1", base_rows=3)
+    before = rollup.version
+
+    rollup.sync(frame(BASE + [("04/09/2026", "Fun", "5")]), version="v1", base_rows=3)
+    assert rollup.daily().tolist() == [10, 20, 30, 5]
+    assert rollup.version == before + 1  # append ครั้งเดียว ไม่ rebuild
+
+
+def test_changed_overlay_rebuilds():
+    rollup = DailyRollup().sync(frame(BASE + [("04/09/2026", "Fun", "5")]), version="v1", base_rows=3)
+    rollup.sync(frame(BASE + [("04/09/2026", "Fun", "7")]), version="v1", base_rows=3)
+    assert rollup.daily().tolist() == [10, 20, 30, 7]
+
+    rollup.sync(frame(BASE), version="v1", base_rows=3)  # overlay ถูกยืนยัน/ล้างออก
+    assert rollup.daily().tolist() == [10, 20, 30]
+
+
+def test_data_version_is_stable_across_instances():
+    df = frame(BASE + [("04/09/2026", "Fun", "5")])
+    a = DailyRollup().sync(df, version="v1", base_rows=3)
+    b = DailyRollup().sync(df, version="v1", base_rows=3)
+    assert a.data_version == b.data_version
+    assert DailyRollup().sync(df, version="v2", base_rows=3).data_version != a.data_version
+    assert DailyRollup().sync(df).data_version is None
+
+
+def test_overlays_window_sums_and_mtd():
+    idx = pd.date_range("2026-08-30", periods=4, freq="D")
+    ov = build_overlays(pd.Series([1.0, 2.0, 3.0, 4.0], index=idx), windows=(2,))
+    assert ov["Sum_2D"].tolist() == [1, 3, 5, 7]
+    assert ov["Mean_2D"].tolist() == [1, 1.5, 2.5, 3.5]
+    assert np.allclose(ov["MTD"], [1, 3, 3, 7])  # 1 ก.ย. เริ่มเดือนใหม่
@@ -0,0 +1,33 @@
+import base64
+
+import numpy as np
+import pandas as pd
+
+from client_view import CLIENT_DIMS, build_client_payload
+
+
+def decode(col):
+    dtype = {"Int16": "<i2", "Int32": "<i4", "Float64": "<f8"}[col["type"]]
+    return np.frombuffer(base64.b64decode(col["data"]), dtype=dtype)
+
+
+def test_payload_groups_by_type_end_like_server_filter():
+    df = pd.DataFrame({
+        "Date": ["01/09/2026", "01/09/2026", "02/09/2026", "02/09/2026"],
+        "Type": ["Need", "Need", "Want", "Want"],
+        "Type_End": ["Save", "Save", "Want", None],
+        "List": ["Rent", "Rent", "Fun", "Fun"],
+        "Channel": ["Card", "Card", "Cash", "Cash"],
+        "Price": ["100", "50", "฿20", "5"],
+    })
+    p = build_client_payload(df)
+
+    assert set(p["labels"]) == set(CLIENT_DIMS) and "Type" not in p["labels"]
+    assert p["labels"]["Type_End"] == ["Save", "Want"]
+    assert (p["start"], p["days"], p["rows"]) == ("2026-09-01", 2, 3)
+
+    type_end = decode(p["columns"]["Type_End"])
+    total = decode(p["columns"]["total"])
+    save = p["labels"]["Type_End"].index("Save")
+    assert total[type_end == save].sum() == 150.0
+    assert total[type_end == -1].sum() == 5.0
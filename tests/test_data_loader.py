@@ -0,0 +1,26 @@
+import pandas as pd
+
+from data_loader import MAIN_COLS, read_main_table
+from fake_sheet import MAIN_HEADER, FakeWorksheet
+
+
+def sheet(tmp_path, rows):
+    ws = FakeWorksheet(str(tmp_path / "Month_25.csv"), "Month_25")
+    ws._write_grid([MAIN_HEADER, *rows])
+    return ws
+
+
+def test_header_only_sheet_keeps_columns(tmp_path):
+    df = read_main_table(sheet(tmp_path, []))
+    assert df.empty
+    assert df.columns.tolist() == MAIN_COLS
+    assert df["Price"].dtype == "float64"
+
+
+def test_price_cells_come_back_as_numbers(tmp_path):
+    df = read_main_table(sheet(tmp_path, [
+        ["01/09/2026", "Food", "Need", "Need", "Cash", "฿1,234.50"],
+        ["02/09/2026", "Taxi", "Need", "Need", "Card", ""],
+    ]))
+    assert df["Date"].tolist() == ["01/09/2026", "02/09/2026"]
+    assert df["Price"].iloc[0] == 1234.5 and pd.isna(df["Price"].iloc[1])
@@ -0,0 +1,56 @@
+import io
+from functools import partial
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+from export import available_formats, export_frame
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        "Date": ["01/09/2026", "02/09/2026", "03/09/2026"],
+        "List": ["อาหาร", None, "Taxi"],
+        "Price": [10.5, 20.0, None],
+    })
+
+
+@pytest.mark.parametrize("fmt", available_formats())
+def test_download_callable_passes_streamlit_converter(df, fmt):
+    # st.download_button(data=partial(export_frame, ...)) ส่งผลลัพธ์เข้า converter นี้ตอนกด
+    data = partial(export_frame, df, fmt)()
+    payload, _ = convert_data_to_bytes_and_infer_mime(data, unsupported_error=TypeError(fmt))
+    assert isinstance(payload, bytes) and payload
+
+
+def test_csv_has_bom_header_and_all_chunks(df):
+    text = export_frame(df, "csv", chunk_rows=1).decode("utf-8")
+    assert text.startswith("﻿Date,List,Price")
+    back = pd.read_csv(io.StringIO(text.lstrip("﻿")))
+    assert back["Date"].tolist() == df["Date"].tolist()
+    assert back["List"].iloc[0] == "อาหาร"
+
+
+def test_csv_empty_frame_keeps_header(df):
+    assert export_frame(df.iloc[:0], "csv").decode("utf-8") == "﻿Date,List,Price\n"
+
+
+def test_parquet_roundtrip_across_chunks(df):
+    table = pq.read_table(io.BytesIO(export_frame(df, "parquet", chunk_rows=2)))
+    assert table.num_rows == 3
+    assert table.column("Price").to_pylist()[:2] == [10.5, 20.0]
+
+
+def test_xlsx_rows():
+    openpyxl = pytest.importorskip("openpyxl")
+    df = pd.DataFrame({"List": ["a", None], "Price": [float("nan"), 2.5]})
+    wb = openpyxl.load_workbook(io.BytesIO(export_frame(df, "xlsx")))
+    assert list(wb["data"].values) == [("List", "Price"), ("a", None), (None, 2.5)]
+
+
+def test_unknown_format(df):
+    with pytest.raises(ValueError):
+        export_frame(df, "pdf")
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from money import parse_money, to_money
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("12,345", 12345.0),
+    ("฿12,345.00", 12345.0),
+    ("(1,234.00)", -1234.0),
+    ("-฿1,234", -1234.0),
+    ("1,234 บาท", 1234.0),
+    ("THB 99.5", 99.5),
+    ("๑,๒๓๔", 1234.0),
+    (" 123 ", 123.0),
+    ("\u00a0123\u00a0", 123.0),
+    ("1 234 567", 1234567.0),
+    ("1\u202f234", 1234.0),
+    ("\u200b50", 50.0),
+])
+def test_parse_valid(text, expected):
+    assert to_money(pd.Series([text])).iloc[0] == expected
+
+
+@pytest.mark.parametrize("text", ["(-5)", "(+5)", "12 34", "1 2345", "abc", "", "1.2.3"])
+def test_parse_invalid_is_nan(text):
+    values, ok = parse_money(pd.Series([text]))
+    assert np.isnan(values[0]) and not ok[0]
+
+
+def test_numeric_fast_path_and_missing():
+    values, ok = parse_money(pd.Series([1.5, None, 3]))
+    assert values[0] == 1.5 and np.isnan(values[1]) and values[2] == 3
+    assert ok.tolist() == [True, False, True]
+
+
+def test_to_money_keeps_index_and_mixed_objects():
+    s = pd.Series(["฿10.00", 20.0, None], index=[5, 6, 7], dtype="object")
+    out = to_money(s)
+    assert out.index.tolist() == [5, 6, 7]
+    assert out.iloc[:2].tolist() == [10.0, 20.0] and np.isnan(out.iloc[2])
+
+
+def test_numbers_inside_object_column_skip_string_parsing():
+    # UNFORMATTED_VALUE ของ Sheets API: ตัวเลขเป็น int/float ปนกับ string / ช่องว่าง
+    s = pd.Series([1e-05, 2e16, 12, "1,234.50", "", None, True], dtype="object")
+    out = to_money(s)
+    assert out.iloc[:4].tolist() == [1e-05, 2e16, 12.0, 1234.5]
+    assert out.iloc[4:].isna().all()
@@ -0,0 +1,89 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import shared_cache
+from shared_cache import SharedSnapshotCache
+
+
+def frame(n):
+    df = pd.DataFrame({"List": ["a"] * n, "Price": [1.0] * n})
+    df.attrs["fetched_at"] = 1.0
+    return df
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SharedSnapshotCache(str(tmp_path), ttl=0.05)
+
+
+def test_fresh_snapshot_is_shared(cache, tmp_path):
+    assert len(cache.get(lambda: frame(2))) == 2
+    other = SharedSnapshotCache(str(tmp_path), ttl=60)
+    out = other.get(lambda: pytest.fail("ไม่ควร fetch"))
+    assert len(out) == 2 and out.attrs["fetched_at"] == 1.0
+
+
+def test_failed_refresh_backs_off(cache, monkeypatch):
+    cache.get(lambda: frame(1))
+    time.sleep(0.06)
+
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise RuntimeError("sheet down")
+
+    assert len(cache.get(broken)) == 1
+    assert len(cache.get(broken)) == 1      # ยังอยู่ใน backoff -> ไม่ fetch ซ้ำ
+    assert calls == [1]
+
+    monkeypatch.setattr(shared_cache, "RETRY_BACKOFF", 0)
+    assert len(cache.get(lambda: frame(3))) == 3
+
+
+def test_first_fetch_failure_raises(cache):
+    with pytest.raises(RuntimeError):
+        cache.get(lambda: (_ for _ in ()).throw(RuntimeError("no sheet")))
+
+
+def test_stale_snapshot_is_served_while_another_thread_refreshes(cache):
+    cache.get(lambda: frame(1))
+    time.sleep(0.06)
+
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return frame(5)
+
+    worker = threading.Thread(target=cache.get, args=(slow,))
+    worker.start()
+    assert started.wait(5)
+
+    t0 = time.time()
+    assert len(cache.get(lambda: pytest.fail("ไม่ควร fetch ซ้อน"))) == 1
+    assert time.time() - t0 < 1
+
+    release.set()
+    worker.join(5)
+    assert len(SharedSnapshotCache(cache.folder, ttl=60).get(lambda: frame(0))) == 5
+
+
+def test_load_maps_numeric_columns_without_copying(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    n = 200_000
+    cache = SharedSnapshotCache(str(tmp_path), ttl=60)
+    cache.get(lambda: pd.DataFrame({
+        "Price": [1.5] * n,
+        "date_dt": pd.date_range("2026-01-01", periods=n, freq="min"),
+    }))
+    cache.release()
+
+    before = pa.total_allocated_bytes()
+    df = cache.get(lambda: pytest.fail("ไม่ควร fetch"))
+    assert len(df) == n
+    assert pa.total_allocated_bytes() - before < 1024 * 1024
@@ -0,0 +1,92 @@
+import pytest
+
+from projection import DAILY_OFFSET
+from tenants import DEFAULT_TENANT, ClientPool, TenantConfig, can_access, load_tenants, resolve_tenant
+
+
+class Session:
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class Client:
+    def __init__(self, credentials):
+        self.credentials = credentials
+        self.http_client = type("Http", (), {"session": Session()})()
+        self.opened = []
+
+    def open_by_key(self, key):
+        self.opened.append(key)
+        return (self, key)
+
+
+def tenant(tid, credentials, sheet_id=None):
+    return TenantConfig(id=tid, sheet_id=sheet_id or f"sheet-{tid}", sheet_name="Month_25", credentials=credentials)
+
+
+def test_tenants_sharing_credentials_share_a_client():
+    pool = ClientPool(lambda t: Client(t.credentials), max_clients=2)
+    a, b = tenant("a", "sa"), tenant("b", "sa")
+    assert pool.client(a) is pool.client(b)
+    assert pool.spreadsheet(a) is pool.spreadsheet(a)
+    assert pool.client(a).opened == ["sheet-a"]
+
+
+def test_evicted_client_takes_its_books_with_it():
+    pool = ClientPool(lambda t: Client(t.credentials), max_clients=1)
+    a, b = tenant("a", "sa1"), tenant("b", "sa2")
+
+    client_a, _ = pool.spreadsheet(a)
+    pool.spreadsheet(b)                      # sa1 หลุดจาก pool -> session ปิด
+    assert client_a.http_client.session.closed
+
+    client_a2, _ = pool.spreadsheet(a)       # ต้องได้ client ใหม่ ไม่ใช่ book ที่ผูกกับ session ที่ปิดแล้ว
+    assert client_a2 is not client_a
+    assert not client_a2.http_client.session.closed
+
+
+def test_load_and_resolve_tenants():
+    default = TenantConfig(DEFAULT_TENANT, "main", "Month_25")
+    assert resolve_tenant(load_tenants({}, default)) is default
+
+    tenants = load_tenants({"tenants": {"home": {"sheet_id": "x", "ttl": 60}}}, default)
+    home = resolve_tenant(tenants)
+    assert (home.sheet_name, home.ttl, home.label) == ("Month_25", 60.0, "home")
+    with pytest.raises(KeyError):
+        resolve_tenant(tenants, "nope")
+
+
+def test_daily_offset_from_secrets():
+    default = TenantConfig(DEFAULT_TENANT, "main", "Month_25")
+    assert default.daily_offset == DAILY_OFFSET
+    assert resolve_tenant(load_tenants({"daily_offset": 150}, default)).daily_offset == 150.0
+
+    tenants = load_tenants({"daily_offset": 150, "tenants": {
+        "home": {"sheet_id": "h", "daily_offset": "99.5"},
+        "shop": {"sheet_id": "s"},
+    }}, default)
+    assert tenants["home"].daily_offset == 99.5
+    assert tenants["shop"].daily_offset == 150.0
+
+
+def test_tenants_from_secrets_are_closed_unless_configured():
+    default = TenantConfig(DEFAULT_TENANT, "main", "Month_25", public=True)
+    tenants = load_tenants({"tenants": {
+        "home": {"sheet_id": "h", "token": "s3cret", "allowed_users": ["Me@Example.com"]},
+        "open": {"sheet_id": "o", "public": True},
+        "bare": {"sheet_id": "b"},
+    }}, default)
+
+    home = tenants["home"]
+    assert not can_access(home)
+    assert not can_access(home, token="wrong")
+    assert can_access(home, token="s3cret")
+    assert can_access(home, user_email="me@example.com")
+    assert not can_access(home, user_email="other@example.com")
+    assert "s3cret" not in repr(home)
+
+    assert can_access(tenants["open"])
+    assert not can_access(tenants["bare"], token="", user_email="me@example.com")
+    assert can_access(resolve_tenant(load_tenants({}, default)))
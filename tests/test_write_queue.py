@@ -0,0 +1,148 @@
+import time
+
+import pandas as pd
+import pytest
+
+import write_queue as wq
+from money import to_money
+from write_queue import CONFIRMED, FAILED, PENDING, WriteQueue, apply_pending
+
+
+class FakeSheet:
+    def __init__(self):
+        self.rows = []
+        self.fail = None
+
+    def append_rows(self, rows, value_input_option=None, table_range=None):
+        if self.fail:
+            raise RuntimeError(self.fail)
+        self.rows.extend(rows)
+
+
+@pytest.fixture
+def sheet():
+    return FakeSheet()
+
+
+@pytest.fixture
+def queue(sheet, monkeypatch):
+    q = WriteQueue(lambda: sheet, flush_interval=0)
+    monkeypatch.setattr(q, "_ensure_worker", lambda: None)  # flush() เองในเทสต์
+    return q
+
+
+def row(price="10.00"):
+    return ["01/09/2026", "Need", "Food", "Cash", "Want", price]
+
+
+def test_pending_then_confirmed_in_one_batch(queue, sheet):
+    a, b = queue.submit(row("1")), queue.submit(row("2"))
+    assert [e.status for e in queue.overlay_entries()] == [PENDING, PENDING]
+
+    assert queue.flush() == 2
+    assert sheet.rows == [a.row, b.row] and queue.batches_written == 1
+    assert a.status == CONFIRMED and a.confirmed_at is not None
+
+
+def test_failed_entries_survive_purge_until_retried(queue, sheet, monkeypatch):
+    sheet.fail = "quota"
+    entry = queue.submit(row())
+    queue.flush()
+    assert entry.status == FAILED and entry.error == "quota"
+
+    # เลย KEEP_CONFIRMED ไปนานแล้ว: แถว failed ต้องยังอยู่ให้กดลองใหม่
+    monkeypatch.setattr(wq, "KEEP_CONFIRMED", -1)
+    assert queue.overlay_entries() == []
+    assert queue.failed_entries() == [entry]
+
+    sheet.fail = None
+    queue.retry_failed()
+    assert entry.status == PENDING and entry.error == ""
+    assert queue.flush() == 1
+    assert entry.status == CONFIRMED and queue.failed_entries() == []
+
+
+def test_dismiss_failed_drops_only_failed(queue, sheet):
+    sheet.fail = "boom"
+    queue.submit(row("1"))
+    queue.flush()
+    sheet.fail = None
+    kept = queue.submit(row("2"))
+
+    queue.dismiss_failed()
+    assert queue.failed_entries() == []
+    assert queue.overlay_entries() == [kept]
+
+
+def test_confirmed_entries_expire(queue, monkeypatch):
+    queue.submit(row())
+    queue.flush()
+    assert len(queue.overlay_entries()) == 1
+    monkeypatch.setattr(wq, "KEEP_CONFIRMED", -1)
+    assert queue.overlay_entries() == []
+
+
+def test_apply_pending_appends_numeric_price(queue):
+    df = pd.DataFrame([row("5")], columns=["Date", "Type", "List", "Channel", "Type_End", "Price"])
+    df["Price"] = 5.0
+    df.attrs["fetched_at"] = 0.0
+    queue.submit(row("1,234.50"))
+
+    out = apply_pending(df, queue)
+    assert out["Price"].tolist() == [5.0, 1234.5]
+    assert out.attrs["pending_index"] == [1]
+
+
+T0 = time.time() - 200  # เวลาสมมติ (ไม่ให้หลุด KEEP_CONFIRMED)
+COLS = ["Date", "Type", "List", "Channel", "Type_End", "Price"]
+
+
+def snapshot(rows, read_started_at, fetched_at):
+    df = pd.DataFrame(rows, columns=COLS)
+    df["Date"] = df["Date"].str.replace("01/09", "1/9")  # รูปแบบวันที่ในชีตไม่จำเป็นต้องตรงกับฟอร์ม
+    df["Price"] = to_money(df["Price"])
+    df.attrs.update(read_started_at=read_started_at, fetched_at=fetched_at, main_cols=COLS)
+    return df
+
+
+def confirmed(queue, price, sent_at, confirmed_at):
+    entry = queue.submit(row(price))
+    queue.flush()
+    entry.sent_at, entry.confirmed_at = sent_at, confirmed_at
+    return entry
+
+
+def test_batch_confirmed_during_read_is_not_counted_twice(queue):
+    # ส่งก่อนอ่านเสร็จ ยืนยันหลังเริ่มอ่าน และติดมากับ snapshot แล้ว -> ไม่แปะซ้ำ
+    confirmed(queue, "7", sent_at=T0 + 99.0, confirmed_at=T0 + 101.0)
+    df = snapshot([row("5"), row("7")], read_started_at=T0 + 100.0, fetched_at=T0 + 102.0)
+
+    out = apply_pending(df, queue)
+    assert out is df and len(out) == 2
+
+
+def test_batch_confirmed_during_read_but_missing_is_kept(queue):
+    confirmed(queue, "7", sent_at=T0 + 100.5, confirmed_at=T0 + 101.0)
+    df = snapshot([row("5")], read_started_at=T0 + 100.0, fetched_at=T0 + 102.0)
+    assert apply_pending(df, queue)["Price"].tolist() == [5.0, 7.0]
+
+
+def test_dedupe_matches_each_snapshot_row_once(queue):
+    # แถวเหมือนกัน 2 แถวในคิว แต่ snapshot มีแค่ 1 -> เหลือแปะ 1
+    confirmed(queue, "7", sent_at=T0 + 99.0, confirmed_at=T0 + 101.0)
+    confirmed(queue, "7", sent_at=T0 + 99.0, confirmed_at=T0 + 101.0)
+    df = snapshot([row("7")], read_started_at=T0 + 100.0, fetched_at=T0 + 102.0)
+    assert apply_pending(df, queue)["Price"].tolist() == [7.0, 7.0]
+
+
+def test_batch_sent_after_read_is_always_overlaid(queue):
+    # แถวเหมือนกันทุกค่าก็ต้องแปะ เพราะส่งหลังอ่านชีตเสร็จแล้ว
+    confirmed(queue, "7", sent_at=T0 + 103.0, confirmed_at=T0 + 104.0)
+    df = snapshot([row("7")], read_started_at=T0 + 100.0, fetched_at=T0 + 102.0)
+    assert apply_pending(df, queue)["Price"].tolist() == [7.0, 7.0]
+
+
+def test_batch_confirmed_before_read_is_in_snapshot(queue):
+    confirmed(queue, "7", sent_at=T0 + 98.0, confirmed_at=T0 + 99.0)
+    df = snapshot([row("7")], read_started_at=T0 + 100.0, fetched_at=T0 + 102.0)
+    assert apply_pending(df, queue) is df
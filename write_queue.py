@@ -0,0 +1,218 @@
+# write_queue.py
+import itertools
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from data_meta import parse_dates
+from money import to_money
+
+# ---------------- CONFIG ----------------
+FLUSH_INTERVAL = 1.0      # วินาทีที่รอรวมแถวจากหลาย session ก่อนเขียน 1 ครั้ง
+MAX_BATCH_ROWS = 500      # แถวสูงสุดต่อ append_rows 1 call
+KEEP_CONFIRMED = 900      # วินาทีที่ยังจำแถวที่เขียนแล้ว (เผื่อ cache load_data ยังไม่ refresh)
+                          # แถว failed อยู่จนกว่าผู้ใช้จะกดลองใหม่ / ทิ้ง
+DEDUPE_TAIL_ROWS = 1000   # แถวท้าย snapshot ที่ใช้เทียบ batch ที่เขียนระหว่างอ่านชีต
+
+PENDING = "pending"
+CONFIRMED = "confirmed"
+FAILED = "failed"
+
+_ids = itertools.count(1)
+
+
+@dataclass
+class PendingEntry:
+    row: list                                  # ตามลำดับคอลัมน์ในชีต (A:F)
+    id: int = field(default_factory=lambda: next(_ids))
+    status: str = PENDING
+    error: str = ""
+    created_at: float = field(default_factory=time.time)
+    sent_at: float = None                      # เริ่มเรียก append_rows (ครั้งล่าสุด)
+    confirmed_at: float = None
+
+
+class WriteQueue:
+    """
+    คิวเขียนแถวใหม่ลงชีต ใช้ร่วมกันทุก session ใน process (st.cache_resource)
+
+    - submit() คืนทันที (optimistic) แถวจะถูกรวมเป็น batch แล้วเขียนด้วย append_rows ครั้งเดียว
+    - overlay_entries() ให้แถวที่ยังไม่อยู่ใน snapshot ของ load_data ไปแปะท้าย frame
+    """
+
+    def __init__(
+        self,
+        worksheet_factory,
+        table_range: str = "A:F",
+        flush_interval: float = FLUSH_INTERVAL,
+        max_batch: int = MAX_BATCH_ROWS,
+    ):
+        self._worksheet_factory = worksheet_factory
+        self.table_range = table_range
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+
+        self._entries = []            # pending + failed + confirmed ล่าสุด
+        self._queue = []              # แถวที่รอเขียน
+        self._cond = threading.Condition()
+        self._worker = None
+        self.batches_written = 0
+
+    # ---------------- submit ----------------
+    def submit(self, row: list) -> PendingEntry:
+        entry = PendingEntry(row=list(row))
+        with self._cond:
+            self._entries.append(entry)
+            self._queue.append(entry)
+            self._ensure_worker()
+            self._cond.notify()
+        return entry
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="sheet-write-queue", daemon=True)
+            self._worker.start()
+
+    # ---------------- worker ----------------
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+
+            # รอสักพักให้ session อื่นส่งแถวเข้ามารวม batch เดียวกัน
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        เขียนทุกแถวที่รออยู่ (ทีละ max_batch) คืนจำนวนแถวที่เขียนสำเร็จ
+        """
+        written = 0
+        while True:
+            with self._cond:
+                batch, self._queue = self._queue[:self.max_batch], self._queue[self.max_batch:]
+                sent_at = time.time()
+                for entry in batch:
+                    entry.sent_at = sent_at
+            if not batch:
+                return written
+
+            try:
+                self._worksheet_factory().append_rows(
+                    [e.row for e in batch],
+                    value_input_option="USER_ENTERED",
+                    table_range=self.table_range,
+                )
+            except Exception as e:
+                with self._cond:
+                    for entry in batch:
+                        entry.status, entry.error = FAILED, str(e)
+                continue
+
+            now = time.time()
+            with self._cond:
+                for entry in batch:
+                    entry.status, entry.confirmed_at = CONFIRMED, now
+                self.batches_written += 1
+            written += len(batch)
+
+    # ---------------- read ----------------
+    def overlay_entries(self, fetched_at: float = None, read_started_at: float = None) -> list:
+        """
+        แถวที่ snapshot (อ่านชีตช่วง read_started_at..fetched_at) อาจยังไม่มี:
+        pending ทั้งหมด + confirmed หลังเริ่มอ่าน (ไม่ระบุ read_started_at -> หลัง fetched_at)
+        """
+        since = read_started_at if read_started_at is not None else fetched_at
+        cutoff = time.time() - KEEP_CONFIRMED
+        with self._cond:
+            self._entries = [
+                e for e in self._entries
+                if e.status != CONFIRMED or e.confirmed_at >= cutoff
+            ]
+            return [
+                e for e in self._entries
+                if e.status == PENDING
+                or (e.status == CONFIRMED and (since is None or e.confirmed_at > since))
+            ]
+
+    def failed_entries(self) -> list:
+        with self._cond:
+            return [e for e in self._entries if e.status == FAILED]
+
+    def retry_failed(self):
+        with self._cond:
+            for e in self._entries:
+                if e.status == FAILED:
+                    e.status, e.error = PENDING, ""
+                    self._queue.append(e)
+            self._ensure_worker()
+            self._cond.notify()
+
+    def dismiss_failed(self):
+        with self._cond:
+            self._entries = [e for e in self._entries if e.status != FAILED]
+
+
+def _row_keys(frame: pd.DataFrame) -> list:
+    # ค่าที่ใช้เทียบแถวระหว่าง snapshot กับแถวในคิว (วันที่ parse แล้ว, ตัวเลขปัด 2 ตำแหน่ง)
+    keys = []
+    for col in frame.columns:
+        s = frame[col]
+        if col == "Date":
+            s = parse_dates(s)
+        elif pd.api.types.is_numeric_dtype(s.dtype):
+            s = s.round(2)
+        else:
+            s = s.astype("string").str.strip().fillna("")
+        keys.append(s.astype(object).where(s.notna(), None))
+    return list(zip(*keys))
+
+
+def apply_pending(df: pd.DataFrame, queue: WriteQueue) -> pd.DataFrame:
+    """
+    แปะแถวที่เพิ่งกรอก (ยังไม่อยู่ใน snapshot) ท้าย frame แบบ optimistic
+    df.attrs["pending_index"] = index ของแถวที่ยังรอเขียนลงชีต
+    """
+    if queue is None or df is None:
+        return df
+
+    fetched_at = df.attrs.get("fetched_at")
+    entries = queue.overlay_entries(fetched_at, df.attrs.get("read_started_at"))
+    if not entries:
+        return df
+
+    cols = [c for c in df.columns if c in df.attrs.get("main_cols", df.columns)]
+    new = pd.DataFrame([(e.row + [None] * len(cols))[:len(cols)] for e in entries], columns=cols)
+    for col in cols:
+        # snapshot เก็บ Price เป็นตัวเลขแล้ว -> แถวใหม่ต้องเป็นตัวเลขด้วย (กัน object ปน)
+        if pd.api.types.is_numeric_dtype(df[col].dtype):
+            new[col] = to_money(new[col])
+
+    # batch ที่ส่งก่อนอ่านชีตเสร็จแต่ยืนยันหลังเริ่มอ่าน อาจติดมากับ snapshot แล้ว -> ตัดแถวที่ซ้ำท้าย snapshot
+    unsure = [
+        e.status == CONFIRMED and fetched_at is not None and e.sent_at is not None and e.sent_at <= fetched_at
+        for e in entries
+    ]
+    if any(unsure):
+        seen = Counter(_row_keys(df[cols].tail(DEDUPE_TAIL_ROWS)))
+        keep = []
+        for is_unsure, key in zip(unsure, _row_keys(new)):
+            dup = is_unsure and seen[key] > 0
+            if dup:
+                seen[key] -= 1
+            keep.append(not dup)
+        entries = [e for e, k in zip(entries, keep) if k]
+        new = new[keep].reset_index(drop=True)
+        if not entries:
+            return df
+
+    out = pd.concat([df, new], ignore_index=True)
+    out.attrs = dict(df.attrs)
+    out.attrs["pending_index"] = [
+        len(df) + i for i, e in enumerate(entries) if e.status == PENDING
+    ]
+    return out